@@ -13,3 +13,19 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Auto-discover tasks
 app.autodiscover_tasks()
 
+# Periodic jobs (beat runs embedded in the worker, see entrypoint.sh)
+app.conf.beat_schedule = {
+    "recompute-que-pdf-popularity": {
+        "task": "home.utils.recompute_popularity_task",
+        "schedule": crontab(minute="*/15"),
+    },
+    "compact-catalog-changes": {
+        "task": "home.utils.compact_catalog_changes_task",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "refresh-follow-suggestions": {
+        "task": "Profile.signal.refresh_follow_suggestions_task",
+        "schedule": crontab(minute="*/10"),
+    },
+}
+
@@ -68,6 +68,8 @@ SIMPLE_JWT = {
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Answers If-None-Match with 304 for fresh and site-cached responses alike
+    'django.middleware.http.ConditionalGetMiddleware',
 
     # Cache: Fetch first on request, Update last on response wrapped around CommonMiddleware
     'django.middleware.cache.UpdateCacheMiddleware',     # caches the response (runs on response phase) [web:38]
@@ -163,6 +165,12 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_TASK_EAGER_PROPAGATES = True
 CELERY_BROKER_USE_SSL = {'ssl_cert_reqs': ssl.CERT_REQUIRED if not DEBUG else None}
+# PDF previews and avatar resizing decode untrusted files with native code (pdfium is
+# not thread-safe); they run on their own prefork worker (see entrypoint.sh)
+CELERY_TASK_ROUTES = {
+    'home.utils.extract_pdf_metadata_task': {'queue': 'media'},
+    'Profile.signal.process_avatar_task': {'queue': 'media'},
+}
 
 # CORS/CSRF: use plain URLs (no markdown), list each allowed origin when credentials enabled. [web:178][web:184]
 CORS_ALLOWED_ORIGINS = config(
@@ -215,3 +223,7 @@ CACHES = {
 
 # Optional: Vercel Blob Token
 VERCEL_BLOB_TOKEN = os.getenv("BLOB_READ_WRITE_TOKEN")
+
+# Direct-to-blob client uploads (home/blob_tokens.py). Point both at `manage.py fake_blob_server` locally.
+BLOB_API_URL = os.getenv("BLOB_API_URL", "https://blob.vercel-storage.com")
+BLOB_PUBLIC_BASE_URL = os.getenv("BLOB_PUBLIC_BASE_URL")  # default: https://<storeId>.public.blob.vercel-storage.com
@@ -0,0 +1,121 @@
+import hashlib
+import io
+import logging
+
+import requests
+from vercel_blob import delete as del_, put
+
+from .models import profile as ProfileModel
+from .utils import DEFAULT_PROFILE_PIC, invalidate_follow_lists_for_user
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# AVATAR VARIANTS
+# Uploaded avatars are stored as-is in profile_pic; a worker task then decodes
+# them and stores square WebP copies, so list screens (search, followers, inbox)
+# never send clients the full-size original.
+# ==============================================================================
+
+AVATAR_VARIANTS = {"small": 64, "medium": 256}  # px, square
+AVATAR_WEBP_QUALITY = 80
+AVATAR_MAX_DOWNLOAD = 10 * 1024 * 1024
+AVATAR_MAX_PIXELS = 40_000_000                  # refuse decompression bombs before decoding
+AVATAR_FETCH_TIMEOUT = 20
+
+
+def render_avatar_variants(data: bytes) -> dict:
+    """
+    Returns {variant name: WebP bytes}, centre-cropped to a square.
+    Pure function over the image bytes (no DB / network); raises ValueError for
+    anything that is not a usable image.
+    """
+    # Imported lazily: only the worker and the backfill command need Pillow
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width * image.height > AVATAR_MAX_PIXELS:
+                raise ValueError(f"Avatar too large to decode ({image.width}x{image.height})")
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+            variants = {}
+            for name, size in AVATAR_VARIANTS.items():
+                resized = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+                buf = io.BytesIO()
+                resized.save(buf, format="WEBP", quality=AVATAR_WEBP_QUALITY)
+                variants[name] = buf.getvalue()
+            return variants
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Unreadable avatar image: {e}")
+
+
+def _fetch_image_bytes(url: str) -> bytes:
+    """Downloads the avatar, refusing anything above AVATAR_MAX_DOWNLOAD."""
+    with requests.get(url, stream=True, timeout=AVATAR_FETCH_TIMEOUT) as resp:
+        resp.raise_for_status()
+        if int(resp.headers.get("Content-Length") or 0) > AVATAR_MAX_DOWNLOAD:
+            raise ValueError("Avatar too large to process")
+
+        buf = io.BytesIO()
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            buf.write(chunk)
+            if buf.tell() > AVATAR_MAX_DOWNLOAD:
+                raise ValueError("Avatar too large to process")
+        return buf.getvalue()
+
+
+def _delete_blob(url):
+    try:
+        del_(url)
+    except Exception as e:
+        logger.warning(f"Could not delete old avatar variant {url}: {e}")
+
+
+def build_avatar_variants(profile_id, *, force=False) -> bool:
+    """
+    Builds and stores the variants for one profile. Idempotent: profiles whose
+    avatar_source already matches profile_pic are skipped unless force=True.
+    Returns True when the profile was (re)processed.
+    """
+    row = (
+        ProfileModel.objects
+        .only('id', 'user_obj_id', 'profile_pic', 'avatar_source', 'profile_pic_small', 'profile_pic_medium')
+        .filter(pk=profile_id).first()
+    )
+    if not row:
+        logger.warning(f"Profile {profile_id} not found; skipping avatar processing.")
+        return False
+    source = row.profile_pic or ""
+    if not force and row.avatar_source == source:
+        return False
+
+    urls = {name: "" for name in AVATAR_VARIANTS}
+    if source != DEFAULT_PROFILE_PIC and source.startswith(("http://", "https://")):
+        variants = render_avatar_variants(_fetch_image_bytes(source))
+        # Path depends on the source, so a new avatar never reuses a URL clients may have cached
+        tag = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        for name, data in variants.items():
+            blob = put(f"Profile/variants/{row.pk}/{tag}-{name}.webp", data, {"addRandomSuffix": "false"})
+            urls[name] = blob["url"]
+    # The shared default (and anything not downloadable) has no variants; lists fall back to profile_pic
+
+    # update() with a guard: if the avatar changed while we worked, the newer task owns the row
+    updated = ProfileModel.objects.filter(pk=row.pk, profile_pic=row.profile_pic).update(
+        profile_pic_small=urls["small"],
+        profile_pic_medium=urls["medium"],
+        avatar_source=source,
+    )
+    if updated:
+        obsolete = {row.profile_pic_small, row.profile_pic_medium} - set(urls.values())
+        # Followers/following pages show the small variant
+        invalidate_follow_lists_for_user(row.user_obj_id)
+        logger.info(f"Stored avatar variants for profile {row.pk}.")
+    else:
+        obsolete = set(urls.values())
+    for url in obsolete - {""}:
+        _delete_blob(url)
+    return bool(updated)
@@ -0,0 +1,200 @@
+import logging
+
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.dateparse import parse_datetime
+
+from core.pagination import decode_cursor, encode_cursor, merge_sorted
+from core.serializers import datetime_format
+from home.models import QuePdf, AnsPdf
+from home.serializers import QuePdfValuesSerializer, AnsPdfValuesSerializer
+from .models import Follow, FeedEntry
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# ACTIVITY FEED
+# New uploads are pushed onto each follower's timeline (FeedEntry) by a Celery
+# task, so reading a feed is one indexed range scan. Accounts with more than
+# BIG_ACCOUNT_FOLLOWERS followers are not pushed; their recent uploads are pulled
+# at read time and merged in. Feeds are ordered newest first by
+# (created_at, object_id, kind), which is also the cursor.
+# ==============================================================================
+
+FEED_MAX_ENTRIES = 500          # entries kept per timeline; older ones are trimmed on write
+FANOUT_BATCH = 1000             # FeedEntry rows per INSERT
+BIG_ACCOUNT_FOLLOWERS = 5000    # at or above this, fan-out-on-read instead of on write
+
+# kind -> (model, uploader's display label field, serializer for the feed item)
+FEED_SOURCES = {
+    FeedEntry.KIND_QUE_PDF: (QuePdf, 'username', QuePdfValuesSerializer),
+    FeedEntry.KIND_ANS_PDF: (AnsPdf, 'name', AnsPdfValuesSerializer),
+}
+
+_format_datetime = datetime_format()
+
+
+def fan_out_uploads(kind, object_ids):
+    """Appends the uploads to their authors' followers' timelines; returns the number of entries written."""
+    model, label_field, _ = FEED_SOURCES[kind]
+    by_author, by_label = {}, {}
+    for pk, author_id, label, created_at in (
+        model.objects.filter(pk__in=object_ids, created_at__isnull=False)
+        .values_list('pk', 'author_id', label_field, 'created_at')
+    ):
+        if author_id:
+            by_author.setdefault(author_id, []).append((pk, created_at))
+        else:
+            by_label.setdefault(label, []).append((pk, created_at))  # not backfilled yet
+
+    through = Follow.following.through
+    written = 0
+    for follow_pk, actor_id, username, follower_count in (
+        Follow.objects.filter(Q(user_id__in=list(by_author)) | Q(user__username__in=list(by_label)))
+        .values_list('pk', 'user_id', 'user__username', 'follower_count')
+    ):
+        if follower_count >= BIG_ACCOUNT_FOLLOWERS:
+            continue  # pulled by feed_page instead
+        uploads = by_author.get(actor_id, []) + by_label.get(username, [])
+        per_batch = max(FANOUT_BATCH // len(uploads), 1)
+
+        # Keyset over the through table so each batch of followers is one SELECT + one INSERT
+        last_pk = 0
+        while True:
+            links = list(
+                through.objects.filter(to_follow_id=follow_pk, pk__gt=last_pk)
+                .order_by('pk').values_list('pk', 'from_follow__user_id')[:per_batch]
+            )
+            if not links:
+                break
+            last_pk = links[-1][0]
+            owner_ids = [owner_id for _, owner_id in links]
+            FeedEntry.objects.bulk_create(
+                [
+                    FeedEntry(owner_id=owner_id, actor_id=actor_id, kind=kind, object_id=pk, created_at=created_at)
+                    for owner_id in owner_ids
+                    for pk, created_at in uploads
+                ],
+                ignore_conflicts=True,
+            )
+            trim_feeds(owner_ids)
+            written += len(owner_ids) * len(uploads)
+
+    logger.info(f"Fanned out {len(object_ids)} {kind} upload(s) as {written} feed entries.")
+    return written
+
+
+def trim_feeds(owner_ids):
+    """Drops entries beyond FEED_MAX_ENTRIES for the given timelines (only the ones that are over)."""
+    over = list(
+        FeedEntry.objects.filter(owner_id__in=owner_ids)
+        .values('owner_id').annotate(n=Count('id')).filter(n__gt=FEED_MAX_ENTRIES)
+        .values_list('owner_id', flat=True)
+    )
+    if not over:
+        return 0
+    stale = list(
+        FeedEntry.objects.filter(owner_id__in=over)
+        .annotate(position=Window(
+            RowNumber(),
+            partition_by=[F('owner_id')],
+            order_by=[F('created_at').desc(), F('object_id').desc(), F('kind').desc()],
+        ))
+        .filter(position__gt=FEED_MAX_ENTRIES)
+        .values_list('pk', flat=True)
+    )
+    deleted, _ = FeedEntry.objects.filter(pk__in=stale).delete()
+    return deleted
+
+
+def _after(position, created_field, id_field, kind=None):
+    """Rows strictly after `position` in (created_at, object_id, kind) descending order."""
+    created_at, object_id, position_kind = position
+    q = Q(**{f'{created_field}__lt': created_at}) | Q(**{created_field: created_at, f'{id_field}__lt': object_id})
+    if kind is None:
+        q |= Q(**{created_field: created_at, id_field: object_id, 'kind__lt': position_kind})
+    elif kind < position_kind:
+        q |= Q(**{created_field: created_at, id_field: object_id})
+    return q
+
+
+def feed_page(user, *, cursor=None, page_size=20):
+    """
+    Returns {"results", "next_cursor"}; each result is {kind, id, actor, created_at, data}
+    where data has the same shape as the QuePdf / AnsPdf list endpoints. Raises
+    ValueError for a cursor this function did not produce.
+    """
+    position = None
+    if cursor:
+        try:
+            created_at, object_id, kind = decode_cursor(cursor)
+            position = (parse_datetime(created_at), int(object_id), str(kind))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if position[0] is None:
+            raise ValueError("Invalid cursor")
+
+    # Every source yields (created_at, object_id, kind, actor) newest first, page_size + 1 deep
+    depth = page_size + 1
+    pushed = FeedEntry.objects.filter(owner=user)
+    if position:
+        pushed = pushed.filter(_after(position, 'created_at', 'object_id'))
+    sources = [list(
+        pushed.order_by('-created_at', '-object_id', '-kind')
+        .values_list('created_at', 'object_id', 'kind', 'actor__username')[:depth]
+    )]
+
+    big_accounts = dict(
+        Follow.objects.filter(followers__user=user, follower_count__gte=BIG_ACCOUNT_FOLLOWERS)
+        .values_list('user_id', 'user__username')
+    )
+    if big_accounts:
+        for kind, (model, label_field, _) in FEED_SOURCES.items():
+            pulled = model.objects.filter(
+                Q(author_id__in=list(big_accounts))
+                | Q(author__isnull=True, **{f'{label_field}__in': list(big_accounts.values())}),
+                created_at__isnull=False,
+            )
+            if position:
+                pulled = pulled.filter(_after(position, 'created_at', 'id', kind))
+            sources.append([
+                (created_at, pk, kind, big_accounts.get(author_id, label))
+                for created_at, pk, author_id, label in
+                pulled.order_by('-created_at', '-id').values_list('created_at', 'id', 'author_id', label_field)[:depth]
+            ])
+
+    # An account that grew past the threshold can have an upload both pushed and pulled
+    seen, items = set(), []
+    for item in merge_sorted(sources, key=lambda item: item[:3], limit=depth * len(sources), reverse=True):
+        if (item[2], item[1]) not in seen:
+            seen.add((item[2], item[1]))
+            items.append(item)
+        if len(items) == depth:
+            break
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([last[0].isoformat(), last[1], last[2]])
+
+    # One query per kind for the uploads themselves; deleted ones are skipped
+    rows = {}
+    for kind, (model, _, serializer) in FEED_SOURCES.items():
+        ids = [object_id for _, object_id, item_kind, _ in items if item_kind == kind]
+        if ids:
+            for row in serializer.iter_rows(model.objects.filter(pk__in=ids)):
+                rows[(kind, row['id'])] = row
+
+    results = [
+        {
+            "kind": kind,
+            "id": object_id,
+            "actor": actor,
+            "created_at": _format_datetime(created_at),
+            "data": rows[(kind, object_id)],
+        }
+        for created_at, object_id, kind, actor in items
+        if (kind, object_id) in rows
+    ]
+    return {"results": results, "next_cursor": next_cursor}
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q
+
+from Profile.avatars import build_avatar_variants, render_avatar_variants
+from Profile.models import profile as ProfileModel
+from Profile.signal import process_avatar_task
+
+
+class Command(BaseCommand):
+    help = "Build the small/medium WebP avatar variants for existing profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild profiles that already have variants.")
+        parser.add_argument("--sync", action="store_true", help="Process inline instead of queueing Celery tasks.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--file",
+            help="Render the variants of a local image and print their sizes. Touches neither the database nor blob storage.",
+        )
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            return self._render_local(options["file"])
+
+        qs = ProfileModel.objects.all()
+        if not options["force"]:
+            qs = qs.filter(~Q(avatar_source=F("profile_pic")))
+
+        done = 0
+        for pk in qs.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=options["batch_size"]):
+            if options["sync"]:
+                try:
+                    build_avatar_variants(pk, force=options["force"])
+                except Exception as e:
+                    self.stderr.write(f"profile {pk}: {e}")
+                    continue
+            else:
+                process_avatar_task.apply_async(args=[pk], kwargs={"force": options["force"]})
+            done += 1
+
+        verb = "Processed" if options["sync"] else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {done} profile(s)."))
+
+    def _render_local(self, path):
+        file_path = Path(path)
+        if not file_path.is_file():
+            raise CommandError(f"No such file: {path}")
+        try:
+            variants = render_avatar_variants(file_path.read_bytes())
+        except ValueError as e:
+            raise CommandError(str(e))
+        for name, data in variants.items():
+            self.stdout.write(f"{name}: {len(data)} bytes")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from Profile.models import Follow
+
+
+def _link_count(column):
+    through = Follow.following.through
+    return Coalesce(Subquery(
+        through.objects.filter(**{column: OuterRef('pk')})
+        .values(column).annotate(n=Count('*')).values('n')[:1]
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute Follow.follower_count / following_count from the following links and fix rows that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        checked = fixed = 0
+        last_pk = 0
+
+        while True:
+            # Keyset over pk; both counts are correlated subqueries so the joins don't multiply
+            batch = list(
+                Follow.objects
+                .filter(pk__gt=last_pk)
+                .order_by('pk')
+                .annotate(actual_followers=_link_count('to_follow'), actual_following=_link_count('from_follow'))
+                .only('id', 'follower_count', 'following_count')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            drifted = []
+            for row in batch:
+                if row.follower_count != row.actual_followers or row.following_count != row.actual_following:
+                    row.follower_count = row.actual_followers
+                    row.following_count = row.actual_following
+                    drifted.append(row)
+
+            if drifted and not options["dry_run"]:
+                Follow.objects.bulk_update(drifted, ['follower_count', 'following_count'])
+            fixed += len(drifted)
+
+        verb = "Would fix" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} Follow row(s). {verb} {fixed}."))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:32
+
+import django.db.models.deletion
+import re
+
+from django.db import migrations, models
+
+
+def _normalize(name):
+    # Same rule as home.models.normalize_course_name: "B.C.A", "bca " and "BCA" all match
+    return re.sub(r"[^0-9a-z]", "", (name or "").lower())
+
+
+def map_course_strings(apps, schema_editor):
+    CourseList = apps.get_model('home', 'CourseList')
+    Profile = apps.get_model('Profile', 'profile')
+
+    courses = {_normalize(name): pk for pk, name in CourseList.objects.values_list('id', 'name')}
+    # One UPDATE per distinct spelling rather than per profile
+    for course in Profile.objects.values_list('course', flat=True).distinct():
+        course_id = courses.get(_normalize(course))
+        if course_id:
+            Profile.objects.filter(course=course).update(course_obj_id=course_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0006_alter_follow_user_alter_profile_user_obj_and_more'),
+        ('home', '0019_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='course_obj',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profiles', to='home.courselist'),
+        ),
+        migrations.RunPython(map_course_strings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = ("username", "first_name", "last_name")
+
+
+def create_user_search_indexes(apps, schema_editor):
+    """
+    Indexes on auth_user for UserSearchView's q= lookups. Django renders icontains /
+    istartswith on Postgres as UPPER(col::text) LIKE UPPER(...), so the trigram GIN
+    indexes are on that exact expression. SQLite can only use an index for prefix LIKE,
+    and only a NOCASE one since its LIKE is case-insensitive.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS auth_user_{column}_trgm "
+                f"ON auth_user USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+            )
+    elif vendor == "sqlite":
+        for column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS auth_user_{column}_nocase ON auth_user ({column} COLLATE NOCASE)"
+            )
+
+
+def drop_user_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    suffix = {"postgresql": "trgm", "sqlite": "nocase"}.get(vendor)
+    if suffix:
+        for column in SEARCH_COLUMNS:
+            schema_editor.execute(f"DROP INDEX IF EXISTS auth_user_{column}_{suffix}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0007_profile_course_obj'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_user_search_indexes, drop_user_search_indexes),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    Follow = apps.get_model('Profile', 'Follow')
+    Through = Follow._meta.get_field('following').remote_field.through
+
+    def counted(column):
+        return Coalesce(Subquery(
+            Through.objects.filter(**{column: OuterRef('pk')})
+            .values(column).annotate(n=Count('*')).values('n')[:1]
+        ), 0)
+
+    Follow.objects.update(follower_count=counted('to_follow'), following_count=counted('from_follow'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0008_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='follow',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='follow',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0010_follow_suggestions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('que_pdf', 'QuePdf'), ('ans_pdf', 'AnsPdf')], max_length=7)),
+                ('object_id', models.IntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', '-created_at', '-object_id'], name='Profile_fee_owner_i_970c44_idx'), models.Index(fields=['kind', 'object_id'], name='Profile_fee_kind_24660c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'kind', 'object_id'), name='unique_feed_entry')],
+            },
+        ),
+    ]
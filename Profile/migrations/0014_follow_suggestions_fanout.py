@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0013_pending_follow_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='follow',
+            name='suggestions_fanout_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Create your models here.
 class profile(models.Model):
@@ -11,8 +12,22 @@ class profile(models.Model):
         max_length=255,
         default="https://mphkxojdifbgafp1.public.blob.vercel-storage.com/Profile/p.webp"
     )
+    # Resized WebP copies of profile_pic built by the avatar task (see avatars.py); empty until then
+    profile_pic_small = models.CharField(max_length=255, blank=True, default="")
+    profile_pic_medium = models.CharField(max_length=255, blank=True, default="")
+    # profile_pic URL the variants were built from; lets the task skip avatars that are already done
+    avatar_source = models.CharField(max_length=255, blank=True, default="")
     # Course is short; keep as-is; optional index if frequently filtered
     course = models.CharField(max_length=30, default="B.C.A")
+    # Resolved from `course` on save (see signal.py); course-scoped lookups join on this instead of the free text
+    course_obj = models.ForeignKey(
+        'home.CourseList',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=True,
+        related_name='profiles',
+    )
 
     def __str__(self):
         return self.user_obj.username
@@ -36,6 +51,13 @@ class Follow(models.Model):
         symmetrical=False,
         related_name='followers'
     )
+    # Maintained from m2m_changed on `following` (see signal.py); reconcile_follow_counts repairs drift
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Set when this user's two-hop neighbourhood or course changes; cleared once suggestions are rebuilt
+    suggestions_stale_at = models.DateTimeField(null=True, blank=True, default=timezone.now, db_index=True)
+    # Set when this user's links or course change: their followers still need flagging (done by the refresh task)
+    suggestions_fanout_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"Follow(user={self.user_id})"
@@ -45,3 +67,75 @@ class Follow(models.Model):
         indexes = [
             models.Index(fields=['user']),
         ]
+
+
+class FollowSuggestion(models.Model):
+    """Precomputed "people you may know" rows (see suggestions.py); rebuilt per user, never edited."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='follow_suggestions')
+    suggested = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    mutual_count = models.PositiveIntegerField(default=0)
+    same_course = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"FollowSuggestion(user={self.user_id}, suggested={self.suggested_id})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'suggested'], name='unique_follow_suggestion'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-score']),
+        ]
+
+
+class FeedEntry(models.Model):
+    """
+    One upload on a follower's timeline, written by the fan-out task (see feed.py).
+    Only references the upload; the feed endpoint loads the rows themselves.
+    """
+    KIND_QUE_PDF = 'que_pdf'
+    KIND_ANS_PDF = 'ans_pdf'
+    KIND_CHOICES = [
+        (KIND_QUE_PDF, 'QuePdf'),
+        (KIND_ANS_PDF, 'AnsPdf'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feed_entries')
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    object_id = models.IntegerField()
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"FeedEntry(owner={self.owner_id}, {self.kind}={self.object_id})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'kind', 'object_id'], name='unique_feed_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-object_id']),  # feed pages
+            models.Index(fields=['kind', 'object_id']),                   # cleanup when an upload is deleted
+        ]
+
+
+class PendingFollowNotification(models.Model):
+    """
+    A follow not yet announced to `recipient`. Collected for a short window and then
+    sent as one digest (see send_follow_digest_task); an unfollow within the window
+    removes the row, so nothing is sent for it.
+    """
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pending_follow_notifications')
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"PendingFollowNotification(recipient={self.recipient_id}, follower={self.follower_id})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recipient', 'follower'], name='unique_pending_follow_notification'),
+        ]
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+from core.pagination import decode_cursor, encode_cursor, merge_sorted
+from core.serializers import datetime_format
+from home.models import QuePdf, AnsPdf, CatalogChange
+from home.sync import record_catalog_changes
+from .serializers import UserQuePostValuesSerializer, UserAnsPostValuesSerializer
+
+# ==============================================================================
+# POST OWNERSHIP
+# QuePdf.author / AnsPdf.author own the rows; username / name are display labels.
+# Rows from before the FK that backfill_post_authors could not link yet are still
+# matched by label.
+# ==============================================================================
+
+POST_LABEL_FIELDS = {QuePdf: 'username', AnsPdf: 'name'}
+LABEL_REFRESH_BATCH = 1000
+
+
+def owned_posts(model, user):
+    """The user's QuePdf or AnsPdf rows."""
+    return model.objects.filter(Q(author=user) | Q(author__isnull=True, **{POST_LABEL_FIELDS[model]: user.username}))
+
+
+def claim_legacy_posts(user, label):
+    """Links unowned rows still labelled `label` to user (before that label changes hands)."""
+    for model, label_field in POST_LABEL_FIELDS.items():
+        model.objects.filter(author__isnull=True, **{label_field: label}).update(author=user)
+
+
+def refresh_post_labels(user):
+    """Rewrites the display label on the user's posts after a rename, in keyset batches."""
+    updated = 0
+    for model, label_field in POST_LABEL_FIELDS.items():
+        catalog_key = CatalogChange.MODEL_QUE_PDF if model is QuePdf else CatalogChange.MODEL_ANS_PDF
+        last_pk = 0
+        while True:
+            ids = list(
+                model.objects.filter(author=user, pk__gt=last_pk).exclude(**{label_field: user.username})
+                .order_by('pk').values_list('pk', flat=True)[:LABEL_REFRESH_BATCH]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+            # update() skips the catalog signals, so log the rows for delta sync explicitly
+            with transaction.atomic():
+                model.objects.filter(pk__in=ids).update(**{label_field: user.username})
+                record_catalog_changes(catalog_key, ids)
+            updated += len(ids)
+    return updated
+
+
+# ==============================================================================
+# USER POSTS STREAM
+# A user's questions and answers as one newest-first stream. Each page reads at
+# most page_size + 1 rows per source, ordered the same way, and merges them. Rows
+# uploaded before created_at existed (NULL) come after all dated ones, newest id
+# first. The order (and cursor) is (created_at, id, kind), descending.
+# ==============================================================================
+
+_format_datetime = datetime_format()
+_OLDEST = datetime.min.replace(tzinfo=dt_timezone.utc)
+
+
+def _post_sources(user):
+    # kind -> (queryset of the user's rows, serializer)
+    return {
+        'que_pdf': (owned_posts(QuePdf, user), UserQuePostValuesSerializer),
+        'ans_pdf': (owned_posts(AnsPdf, user), UserAnsPostValuesSerializer),
+    }
+
+
+def _after(position, kind):
+    """Rows of `kind` strictly after `position` in the stream order."""
+    created_at, pk, position_kind = position
+    tie = Q(id__lt=pk)
+    if kind < position_kind:
+        tie |= Q(id=pk)
+    if created_at is None:
+        return Q(created_at__isnull=True) & tie
+    return Q(created_at__lt=created_at) | Q(created_at__isnull=True) | (Q(created_at=created_at) & tie)
+
+
+def _sort_key(row):
+    return (row['created_at'] is not None, row['created_at'] or _OLDEST, row['id'], row['kind'])
+
+
+def user_posts_page(user, *, cursor=None, page_size=20):
+    """Returns {"posts", "next_cursor"}; raises ValueError for a cursor it did not produce."""
+    position = None
+    if cursor:
+        try:
+            created_at, pk, kind = decode_cursor(cursor)
+            position = (parse_datetime(created_at) if created_at is not None else None, int(pk), str(kind))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+
+    depth = page_size + 1
+    sources = []
+    for kind, (queryset, serializer) in _post_sources(user).items():
+        if position:
+            queryset = queryset.filter(_after(position, kind))
+        queryset = queryset.order_by(F('created_at').desc(nulls_last=True), '-id')[:depth]
+        sources.append(list(serializer.iter_rows(queryset)))
+
+    posts = merge_sorted(sources, key=_sort_key, limit=depth, reverse=True)
+    next_cursor = None
+    if len(posts) > page_size:
+        posts = posts[:page_size]
+        last = posts[-1]
+        last_created = last['created_at'].isoformat() if last['created_at'] else None
+        next_cursor = encode_cursor([last_created, last['id'], last['kind']])
+
+    for row in posts:
+        if row['created_at'] is not None:
+            row['created_at'] = _format_datetime(row['created_at'])
+    return {"posts": posts, "next_cursor": next_cursor}
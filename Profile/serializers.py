@@ -4,6 +4,9 @@ from Profile.models import profile as ProfileModel
 from urllib.parse import unquote
 from home.models import AnsPdf
 from django.contrib.auth.models import User
+from django.db.models import CharField, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+from core.serializers import ValuesSerializer, datetime_format
 
 # Serializer for the profile model
 class profileSerializer(serializers.ModelSerializer):
@@ -45,7 +48,7 @@ class CombinedProfileSerializer(serializers.ModelSerializer):
 class UserPostsSerializer(serializers.ModelSerializer):
     class Meta:
         model = AnsPdf
-        fields = ['id', 'que_pdf', 'name', 'contant', 'pdf']
+        fields = ['id', 'que_pdf', 'name', 'contant', 'pdf', 'page_count', 'file_size', 'first_page_text', 'thumbnail']
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -69,11 +72,90 @@ class UserSearchSerializer(serializers.ModelSerializer):
         profiles_map = self.context.get('profiles_by_user_id')
         if profiles_map is not None:
             prof = profiles_map.get(obj.id)
-            return getattr(prof, 'profile_pic', None) if prof else None
+            return (prof.profile_pic_small or prof.profile_pic or None) if prof else None
 
         # Fallback: original behavior (single get per user)
         try:
-            prof = ProfileModel.objects.select_related('user_obj').only('profile_pic', 'user_obj').get(user_obj=obj)
-            return prof.profile_pic if prof.profile_pic else None
+            prof = ProfileModel.objects.select_related('user_obj').only('profile_pic', 'profile_pic_small', 'user_obj').get(user_obj=obj)
+            return prof.profile_pic_small or prof.profile_pic or None
         except ProfileModel.DoesNotExist:
             return None
+
+
+# List screens get the small avatar variant, or the original until the avatar task has built it
+LIST_PROFILE_PIC = Coalesce(NullIf('profile_pic_small', Value('')), 'profile_pic')
+
+
+def _user_search_fields(prefix=''):
+    """UserSearchSerializer's output as values() sources, for User rows reached through `prefix`."""
+    return (
+        ('username', f'{prefix}username'),
+        ('first_name', f'{prefix}first_name'),
+        ('last_name', f'{prefix}last_name'),
+        ('joined_date', f'{prefix}date_joined'),
+        ('profile_pic', Subquery(
+            ProfileModel.objects.filter(user_obj=OuterRef(f'{prefix}pk')).order_by('id')
+            .annotate(list_pic=LIST_PROFILE_PIC).values('list_pic')[:1]
+        )),
+    )
+
+
+class UserSearchValuesSerializer(ValuesSerializer):
+    """values() fast path for UserSearchSerializer; profile_pic comes from a correlated subquery."""
+    fields = _user_search_fields()
+    formatters = {
+        'joined_date': datetime_format('%Y-%m-%d'),
+        'profile_pic': lambda pic: pic or None,
+    }
+
+
+class FollowerValuesSerializer(UserSearchValuesSerializer):
+    """
+    UserSearchSerializer rows read from the Follow.following through table: the
+    follower side of each link, plus the link id (`link_id`) used as the page cursor.
+    """
+    fields = (('link_id', 'id'),) + _user_search_fields('from_follow__user__')
+
+
+class FollowingValuesSerializer(UserSearchValuesSerializer):
+    """Same as FollowerValuesSerializer for the followed side of each link."""
+    fields = (('link_id', 'id'),) + _user_search_fields('to_follow__user__')
+
+
+class FollowSuggestionValuesSerializer(UserSearchValuesSerializer):
+    """UserSearchSerializer rows for the suggested users, with why they were suggested."""
+    fields = _user_search_fields('suggested__') + (
+        ('mutual_count', 'mutual_count'),
+        ('same_course', 'same_course'),
+    )
+
+
+# ==============================================================================
+# USER POSTS STREAM
+# Questions and answers in one row shape so the merged posts page reads the same
+# for both: `name`/`sub`/`choose`/`sem`/... describe the question, `pdf`/preview
+# fields describe the post itself. created_at is left raw for the merge and
+# formatted by the caller.
+# ==============================================================================
+_POST_PREVIEW_FIELDS = (
+    ('page_count', 'page_count'), ('file_size', 'file_size'),
+    ('first_page_text', 'first_page_text'), ('thumbnail', 'thumbnail'),
+)
+
+
+class UserQuePostValuesSerializer(ValuesSerializer):
+    fields = (
+        ('kind', Value('que_pdf', output_field=CharField())),
+        ('id', 'id'), ('que_pdf', 'id'), ('course', 'course_id'), ('name', 'name'), ('sub', 'sub'),
+        ('choose', 'choose'), ('sem', 'sem'), ('year', 'year'), ('pdf', 'pdf'),
+        ('contant', Value(None, output_field=TextField())),
+    ) + _POST_PREVIEW_FIELDS + (('created_at', 'created_at'),)
+
+
+class UserAnsPostValuesSerializer(ValuesSerializer):
+    fields = (
+        ('kind', Value('ans_pdf', output_field=CharField())),
+        ('id', 'id'), ('que_pdf', 'que_pdf_id'), ('course', 'que_pdf__course_id'), ('name', 'que_pdf__name'),
+        ('sub', 'que_pdf__sub'), ('choose', 'que_pdf__choose'), ('sem', 'que_pdf__sem'), ('year', 'que_pdf__year'),
+        ('pdf', 'pdf'), ('contant', 'contant'),
+    ) + _POST_PREVIEW_FIELDS + (('created_at', 'created_at'),)
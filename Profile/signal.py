@@ -2,13 +2,26 @@ import logging
 import os
 
 # Django & Celery Imports
-from django.db.models.signals import m2m_changed
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
+from django.core.cache import cache
 from django.template.loader import render_to_string
+from django.utils import timezone
+from django.contrib.auth.models import User
 from celery import shared_task
 
 # Local Imports
-from .models import Follow
+from .models import Follow, FeedEntry, PendingFollowNotification, profile
+from .utils import invalidate_follow_lists
+from .suggestions import mark_suggestions_stale, refresh_stale_suggestions
+from .feed import fan_out_uploads
+from .posts import refresh_post_labels
+from .avatars import build_avatar_variants
+from home.models import CourseList, QuePdf, AnsPdf, normalize_course_name
+from home.signal import que_pdfs_bulk_created
 
 # Brevo API client imports
 import sib_api_v3_sdk
@@ -17,6 +30,8 @@ from sib_api_v3_sdk.rest import ApiException
 # Set up a logger for this module
 logger = logging.getLogger(__name__)
 
+SUGGESTION_REFRESH_LIMIT = 5000  # users rebuilt per beat run; the rest wait for the next one
+
 # ==============================================================================
 # BREVO API CLIENT CONFIGURATION
 # This setup is done once when the Celery worker starts, making it more efficient.
@@ -80,90 +95,327 @@ def _send_templated_email(*, subject: str, to_email: str, html_template: str, co
 
 
 # ==============================================================================
-# UPDATED CELERY TASK
-# This task now uses the reusable helper function.
+# FOLLOW NOTIFICATIONS
+# New follows are recorded as PendingFollowNotification rows and announced in one
+# email per recipient after FOLLOW_DIGEST_WINDOW. The first follow in a window
+# queues the digest task (the cache key keeps later ones from queueing another),
+# and an unfollow inside the window withdraws its row, so follow/unfollow churn
+# sends at most one email.
 # ==============================================================================
+
+FOLLOW_DIGEST_WINDOW = 10 * 60   # seconds a digest collects follows before it is sent
+FOLLOW_DIGEST_NAMES = 5          # followers named in a digest; the rest are counted
+
+
+def follow_digest_cache_key(recipient_id):
+    return f"follow_digest:{recipient_id}"
+
+
 @shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 5})
-def send_follow_notification_task(self, instance_data):
+def send_follow_digest_task(self, recipient_id):
     """
-    Sends a "New Follower" notification email by calling the helper function.
+    Sends one "New Follower" / "N new followers" email for everything pending for
+    recipient_id, then drops the rows it announced.
     """
-    logger.info("📨 Celery Task Started: send_follow_notification_task")
+    logger.info(f"📨 Celery Task Started: send_follow_digest_task for user {recipient_id}")
 
-    recipient_email = instance_data.get('recipient_email')
-    follower_username = instance_data.get('follower_username', 'Someone')
+    # Follows from here on open a new window instead of waiting on this one
+    cache.delete(follow_digest_cache_key(recipient_id))
 
-    if not recipient_email:
-        logger.warning("Recipient email missing in task payload. Aborting.")
+    pending = list(
+        PendingFollowNotification.objects.filter(recipient_id=recipient_id)
+        .order_by('-created_at', '-id')
+        .values_list('id', 'follower__username')
+    )
+    if not pending:
+        logger.info(f"No pending follow notifications for user {recipient_id}; nothing to send.")
         return
 
-    try:
-        logger.info(f"📧 Preparing to send follow notification to: {recipient_email}")
+    pending_ids = [pk for pk, _ in pending]
+    recipient = User.objects.filter(pk=recipient_id).values('username', 'email').first()
+    if not recipient or not recipient['email']:
+        logger.warning(f"Recipient email missing for user ID {recipient_id}; dropping {len(pending)} notification(s).")
+        PendingFollowNotification.objects.filter(pk__in=pending_ids).delete()
+        return
+
+    follower_usernames = [username for _, username in pending]
+    count = len(follower_usernames)
+    latest = follower_usernames[0]
+    context = {
+        'following_username': recipient['username'],
+        'follower_username': latest,
+        'follower_usernames': follower_usernames[:FOLLOW_DIGEST_NAMES],
+        'follower_count': count,
+        'others_count': max(count - FOLLOW_DIGEST_NAMES, 0),
+        'profile_url': f"https://pixelclass.netlify.app/profile?username={latest}",
+        'recipient_email': recipient['email'],
+    }
+
+    logger.info(f"📧 Preparing follow notification ({count} follower(s)) for: {recipient['email']}")
+    if count == 1:
         _send_templated_email(
             subject="New Follower Alert!",
-            to_email=recipient_email,
+            to_email=recipient['email'],
             html_template='Following/following.html',
-            context=instance_data,
-            plain_fallback=f"Hi {instance_data.get('following_username', '')},\n\n{follower_username} is now following you on PixelClasses!"
+            context=context,
+            plain_fallback=f"Hi {recipient['username']},\n\n{latest} is now following you on PixelClasses!"
+        )
+    else:
+        _send_templated_email(
+            subject=f"You have {count} new followers!",
+            to_email=recipient['email'],
+            html_template='Following/follow_digest.html',
+            context=context,
+            plain_fallback=(
+                f"Hi {recipient['username']},\n\n{count} people started following you on PixelClasses: "
+                f"{', '.join(follower_usernames[:FOLLOW_DIGEST_NAMES])}"
+                + (f" and {count - FOLLOW_DIGEST_NAMES} more." if count > FOLLOW_DIGEST_NAMES else ".")
+            )
         )
-        logger.info(f"✅ Follow notification queued successfully for {recipient_email}")
+    # Only the rows just announced: follows that arrived meanwhile belong to the next digest
+    PendingFollowNotification.objects.filter(pk__in=pending_ids).delete()
+    logger.info(f"✅ Follow notification sent to {recipient['email']}")
+
+
+def _queue_follow_digests(recipient_ids):
+    for recipient_id in recipient_ids:
+        # cache.add is atomic: only the first follow in a window queues the task
+        if not cache.add(follow_digest_cache_key(recipient_id), 1, timeout=FOLLOW_DIGEST_WINDOW * 2):
+            continue
+        try:
+            send_follow_digest_task.apply_async(args=[recipient_id], countdown=FOLLOW_DIGEST_WINDOW)
+            logger.info(f"🚀 Follow digest scheduled for user {recipient_id}")
+        except Exception as e:
+            cache.delete(follow_digest_cache_key(recipient_id))
+            logger.error(f"Could not schedule follow digest for user {recipient_id}: {e}")
+
+
+def _follow_pairs(instance, reverse, pk_set):
+    """(follower user id, followed user id) for each link in pk_set, in one query."""
+    other_user_ids = Follow.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+    if reverse:
+        return [(other_id, instance.user_id) for other_id in other_user_ids if other_id != instance.user_id]
+    return [(instance.user_id, other_id) for other_id in other_user_ids if other_id != instance.user_id]
+
+
+@receiver(m2m_changed, sender=Follow.following.through)
+def send_follow_notification(sender, instance, action, reverse, pk_set, **kwargs):
+    try:
+        if action == "post_add" and pk_set:
+            pairs = _follow_pairs(instance, reverse, pk_set)
+            PendingFollowNotification.objects.bulk_create(
+                [PendingFollowNotification(follower_id=follower_id, recipient_id=recipient_id) for follower_id, recipient_id in pairs],
+                ignore_conflicts=True,
+            )
+            recipient_ids = {recipient_id for _, recipient_id in pairs}
+            transaction.on_commit(lambda: _queue_follow_digests(recipient_ids), robust=True)
+
+        elif action == "post_remove" and pk_set:
+            # Unfollowed before the digest went out: don't announce it
+            pairs = _follow_pairs(instance, reverse, pk_set)
+            q = Q()
+            for follower_id, recipient_id in pairs:
+                q |= Q(follower_id=follower_id, recipient_id=recipient_id)
+            if pairs:
+                PendingFollowNotification.objects.filter(q).delete()
+
+        elif action == "pre_clear":
+            field = 'recipient_id' if reverse else 'follower_id'
+            PendingFollowNotification.objects.filter(**{field: instance.user_id}).delete()
 
     except Exception as e:
-        logger.exception(f"❌ Failed to queue follow notification for {recipient_email}. Error: {e}")
-        # Re-raise the exception to trigger Celery's automatic retry mechanism
-        raise self.retry(exc=e)
+        logger.exception(f"❌ A critical error occurred in the send_follow_notification signal handler: {e}")
 
 
 # ==============================================================================
-# SIGNAL RECEIVER (NO CHANGES NEEDED)
-# This function correctly prepares data and dispatches the task.
+# FOLLOW COUNTERS
+# Follow.follower_count / following_count follow every add, remove and clear on
+# `following`, from either side, inside the same transaction as the through-table
+# write. Removals are counted in pre_* against the rows that actually exist, since
+# remove() reports every pk it was given and clear() reports none.
 # ==============================================================================
+def _adjust_follow_counts(instance, reverse, other_pks, delta):
+    if not other_pks:
+        return
+    own_field, other_field = ('follower_count', 'following_count') if reverse else ('following_count', 'follower_count')
+    if delta > 0:
+        own_value = F(own_field) + len(other_pks)
+        other_value = F(other_field) + 1
+    else:
+        own_value = Greatest(F(own_field) - len(other_pks), Value(0))
+        other_value = Greatest(F(other_field) - 1, Value(0))
+    Follow.objects.filter(pk=instance.pk).update(**{own_field: own_value})
+    Follow.objects.filter(pk__in=other_pks).update(**{other_field: other_value})
+
+
+def _linked_pks(instance, reverse, pk_set=None):
+    """pks on the other side of `instance` that are linked right now (optionally limited to pk_set)."""
+    own_column, other_column = ('to_follow', 'from_follow') if reverse else ('from_follow', 'to_follow')
+    links = Follow.following.through.objects.filter(**{own_column: instance.pk})
+    if pk_set is not None:
+        links = links.filter(**{f'{other_column}__in': pk_set})
+    return set(links.values_list(f'{other_column}_id', flat=True))
+
+
 @receiver(m2m_changed, sender=Follow.following.through)
-def send_follow_notification(sender, instance, action, pk_set, **kwargs):
-    logger.info("🔔 Signal triggered for Follow.following")
+def follow_counts_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        # add() already left out pks that were linked before
+        changed, delta = pk_set, +1
+    elif action == "pre_remove":
+        changed, delta = _linked_pks(instance, reverse, pk_set), -1
+    elif action == "pre_clear":
+        changed, delta = _linked_pks(instance, reverse), -1
+    else:
+        return
+    if not changed:
+        return
+    _adjust_follow_counts(instance, reverse, changed, delta)
+    # Cached followers/following pages of both sides are stale once this commits
+    affected = {instance.pk, *changed}
+    transaction.on_commit(lambda: invalidate_follow_lists(affected), robust=True)
+
+
+@receiver(pre_delete, sender=Follow)
+def follow_counts_on_delete(sender, instance, **kwargs):
+    # The cascade drops this row's links without m2m_changed; settle the other side first
+    following_pks = _linked_pks(instance, False)
+    follower_pks = _linked_pks(instance, True)
+    Follow.objects.filter(pk__in=following_pks).update(
+        follower_count=Greatest(F('follower_count') - 1, Value(0)))
+    Follow.objects.filter(pk__in=follower_pks).update(
+        following_count=Greatest(F('following_count') - 1, Value(0)))
+    affected = following_pks | follower_pks
+    transaction.on_commit(lambda: invalidate_follow_lists(affected), robust=True)
+
 
-    if action != "post_add":
-        logger.info(f"ℹ️ Action is '{action}', not 'post_add'. Ignoring.")
+# ==============================================================================
+# FOLLOW SUGGESTIONS
+# Link and course changes only flag the affected users; the beat task below
+# rebuilds their suggestions in bulk (see suggestions.py).
+# ==============================================================================
+@receiver(m2m_changed, sender=Follow.following.through)
+def follow_suggestions_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # The follower side of each changed link is the one whose neighbourhood moved
+    if action in ("post_add", "post_remove"):
+        sources = pk_set if reverse else {instance.pk}
+    elif action == "pre_clear":
+        sources = _linked_pks(instance, True) if reverse else {instance.pk}
+    else:
         return
+    if sources:
+        mark_suggestions_stale(sources)
 
-    logger.info("✅ New follow relationship added. Preparing to dispatch task.")
 
+@receiver(post_save, sender=profile)
+def follow_suggestions_on_course_change(sender, instance, created, update_fields=None, **kwargs):
+    # Set by sync_profile_course from the stored row, so ordinary profile saves don't mark anyone
+    if not getattr(instance, '_course_changed', False):
+        return
+    Follow.objects.filter(user_id=instance.user_obj_id).update(suggestions_stale_at=timezone.now())
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 3})
+def refresh_follow_suggestions_task(self):
+    """Scheduled by Celery beat (Pixel/celery.py)."""
+    refresh_stale_suggestions(limit=SUGGESTION_REFRESH_LIMIT)
+
+
+# ==============================================================================
+# ACTIVITY FEED
+# Uploads are fanned out to followers' timelines after commit, off the request
+# path; deleting an upload removes it from every timeline (see feed.py).
+# ==============================================================================
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 3})
+def fan_out_uploads_task(self, kind, object_ids):
+    fan_out_uploads(kind, object_ids)
+
+
+def _queue_fan_out(kind, object_ids):
+    transaction.on_commit(lambda: fan_out_uploads_task.apply_async(args=[kind, object_ids]), robust=True)
+
+
+@receiver(post_save, sender=QuePdf)
+@receiver(post_save, sender=AnsPdf)
+def feed_fan_out_on_create(sender, instance, created, **kwargs):
+    if created:
+        kind = FeedEntry.KIND_QUE_PDF if sender is QuePdf else FeedEntry.KIND_ANS_PDF
+        _queue_fan_out(kind, [instance.pk])
+
+
+@receiver(que_pdfs_bulk_created)
+def feed_fan_out_on_bulk_create(sender, instances, notify=True, **kwargs):
+    # Silent imports (notify=False) stay out of timelines too
+    if notify and instances:
+        _queue_fan_out(FeedEntry.KIND_QUE_PDF, [obj.pk for obj in instances])
+
+
+@receiver(post_delete, sender=QuePdf)
+@receiver(post_delete, sender=AnsPdf)
+def feed_cleanup_on_delete(sender, instance, **kwargs):
+    kind = FeedEntry.KIND_QUE_PDF if sender is QuePdf else FeedEntry.KIND_ANS_PDF
+    FeedEntry.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+# ==============================================================================
+# POST LABELS
+# ==============================================================================
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 3})
+def refresh_post_labels_task(self, user_id):
+    """Queued by EditProfileView after a rename; reads the current username, so repeats are harmless."""
+    user = User.objects.only('id', 'username').filter(pk=user_id).first()
+    if user:
+        updated = refresh_post_labels(user)
+        logger.info(f"Refreshed the username label on {updated} post(s) of user {user_id}.")
+
+
+# ==============================================================================
+# AVATAR VARIANTS
+# Any save that leaves profile_pic different from the source of the stored
+# variants (registration, profile edit, direct upload) queues a rebuild.
+# ==============================================================================
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 3})
+def process_avatar_task(self, profile_id, force=False):
+    """Celery entry point for build_avatar_variants."""
     try:
-        follower_user = instance.user  # User who initiated the follow
-        follower_username = getattr(follower_user, "username", None)
-
-        if not follower_username:
-            logger.warning("Follower username missing; cannot send notifications.")
-            return
-
-        # Query for the user being followed
-        for followed_user_pk in pk_set:
-            try:
-                # Assuming the pk_set contains user IDs being followed
-                followed_user = Follow.objects.get(pk=followed_user_pk).user
-                recipient_email = getattr(followed_user, "email", None)
-                
-                if not recipient_email:
-                    logger.warning(f"Recipient email missing for followed user ID {followed_user_pk}; skipping.")
-                    continue
-
-                context = {
-                    'follower_username': follower_username,
-                    'following_username': getattr(followed_user, "username", ""),
-                    'profile_url': f"https://pixelclass.netlify.app/profile?username={follower_username}",
-                    'recipient_email': recipient_email, # Pass for logging within the task
-                }
-
-                logger.debug(f"📦 Context ready for {recipient_email}: {context}")
-                
-                # Dispatch the updated Celery task
-                send_follow_notification_task.apply_async(args=[context])
-                logger.info(f"🚀 Celery task dispatched for new follower notification to {recipient_email}")
-
-            except Follow.DoesNotExist:
-                 logger.warning(f"Follow object with pk={followed_user_pk} not found. Skipping.")
-            except Exception as e:
-                 logger.error(f"Error processing notification for pk={followed_user_pk}: {e}")
+        build_avatar_variants(profile_id, force=force)
+    except ValueError as e:
+        # Unreadable / oversized images will not get better on retry
+        logger.warning(f"Skipping avatar variants for profile {profile_id}: {e}")
 
-    except Exception as e:
-        logger.exception(f"❌ A critical error occurred in the send_follow_notification signal handler: {e}")
\ No newline at end of file
+
+@receiver(post_save, sender=profile)
+def queue_avatar_processing(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'profile_pic' not in update_fields:
+        return
+    if instance.profile_pic != instance.avatar_source:
+        transaction.on_commit(lambda: process_avatar_task.apply_async(args=[instance.pk]), robust=True)
+
+
+# ==============================================================================
+# COURSE RESOLUTION
+# Keeps profile.course_obj pointing at the CourseList named by the free-text course.
+# ==============================================================================
+def resolve_course_id(course_name):
+    """Returns the CourseList id matching a free-text course name, or None."""
+    wanted = normalize_course_name(course_name)
+    if not wanted:
+        return None
+    # CourseList is a handful of rows; match on the normalized name in Python
+    for pk, name in CourseList.objects.values_list('id', 'name'):
+        if normalize_course_name(name) == wanted:
+            return pk
+    return None
+
+
+@receiver(pre_save, sender=profile)
+def sync_profile_course(sender, instance, update_fields=None, **kwargs):
+    instance._course_changed = False
+    # Saves that don't touch `course` (e.g. avatar updates) skip the lookup
+    if update_fields is not None and 'course' not in update_fields:
+        return
+    stored_course_id = (
+        sender.objects.filter(pk=instance.pk).values_list('course_obj_id', flat=True).first() if instance.pk else None
+    )
+    instance.course_obj_id = resolve_course_id(instance.course)
+    instance._course_changed = instance.course_obj_id != stored_course_id
@@ -0,0 +1,136 @@
+import logging
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Follow, FollowSuggestion, profile as ProfileModel
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# FOLLOW SUGGESTIONS ("people you may know")
+# Candidates are the people your followees follow (scored by how many of your
+# followees do) plus popular people from your course. Results are stored in
+# FollowSuggestion so the endpoint is a single indexed read. Only users marked
+# stale (Follow.suggestions_stale_at) are recomputed on each run. A change only
+# flags the users it touched; their followers are flagged by the refresh run.
+# ==============================================================================
+
+MUTUAL_WEIGHT = 1.0       # per followee who already follows the candidate
+COURSE_WEIGHT = 0.5       # same course: a boost, never worth more than one mutual
+COURSE_CANDIDATES = 50    # most-followed course mates considered per user
+SUGGESTION_KEEP = 20      # rows stored per user
+REFRESH_BATCH = 200       # stale users rebuilt per batch
+
+
+def mark_suggestions_stale(follow_pks):
+    """
+    A link change from X (or X's course) changes the two-hop neighbourhood of X and
+    of everyone following X. Runs on the request path, so it only flags X's own row;
+    expand_stale_followers flags the followers later.
+    """
+    follow_pks = set(follow_pks)
+    if follow_pks:
+        now = timezone.now()
+        Follow.objects.filter(pk__in=follow_pks).update(suggestions_stale_at=now, suggestions_fanout_at=now)
+
+
+def expand_stale_followers():
+    """Flags the followers of every user marked by mark_suggestions_stale; returns how many users were expanded."""
+    expanded = 0
+    while True:
+        batch = list(
+            Follow.objects
+            .filter(suggestions_fanout_at__isnull=False)
+            .order_by('suggestions_fanout_at', 'pk')
+            .values_list('pk', 'suggestions_fanout_at')[:REFRESH_BATCH]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            Follow.objects.filter(following__in=[pk for pk, _ in batch]).update(suggestions_stale_at=timezone.now())
+            # Only clear the marker if the user was not marked again meanwhile
+            marked = Q()
+            for pk, marked_at in batch:
+                marked |= Q(pk=pk, suggestions_fanout_at=marked_at)
+            Follow.objects.filter(marked).update(suggestions_fanout_at=None)
+        expanded += len(batch)
+    return expanded
+
+
+def compute_suggestions(follow_obj):
+    """Returns FollowSuggestion rows (unsaved, best first) for the owner of follow_obj."""
+    through = Follow.following.through
+    user_id = follow_obj.user_id
+    followed = set(through.objects.filter(from_follow_id=follow_obj.pk).values_list('to_follow__user_id', flat=True))
+    excluded = followed | {user_id}
+
+    # Two hops: who do the people I follow follow, and how many of them
+    mutual = Counter(dict(
+        through.objects
+        .filter(from_follow__in=through.objects.filter(from_follow_id=follow_obj.pk).values('to_follow_id'))
+        .exclude(to_follow__user_id__in=excluded)
+        .values_list('to_follow__user_id')
+        .annotate(n=Count('id'))
+    ))
+
+    course_id = (
+        ProfileModel.objects.filter(user_obj_id=user_id).order_by('id').values_list('course_obj_id', flat=True).first()
+    )
+    same_course = set()
+    if course_id:
+        course_mates = ProfileModel.objects.filter(course_obj_id=course_id).exclude(user_obj_id__in=excluded)
+        same_course.update(course_mates.filter(user_obj_id__in=list(mutual)).values_list('user_obj_id', flat=True))
+        same_course.update(
+            course_mates
+            .order_by('-user_obj__follow__follower_count', 'user_obj_id')
+            .values_list('user_obj_id', flat=True)[:COURSE_CANDIDATES]
+        )
+
+    now = timezone.now()
+    scored = []
+    for candidate in set(mutual) | same_course:
+        score = MUTUAL_WEIGHT * mutual[candidate] + (COURSE_WEIGHT if candidate in same_course else 0)
+        scored.append((score, mutual[candidate], candidate))
+    scored.sort(key=lambda item: (-item[0], -item[1], item[2]))
+
+    return [
+        FollowSuggestion(
+            user_id=user_id, suggested_id=candidate, score=score,
+            mutual_count=mutual_count, same_course=candidate in same_course, computed_at=now,
+        )
+        for score, mutual_count, candidate in scored[:SUGGESTION_KEEP]
+    ]
+
+
+def refresh_stale_suggestions(*, limit=None):
+    """Rebuilds suggestions for stale users, oldest flag first; returns how many users were refreshed."""
+    expand_stale_followers()
+    refreshed = 0
+    while limit is None or refreshed < limit:
+        size = REFRESH_BATCH if limit is None else min(REFRESH_BATCH, limit - refreshed)
+        batch = list(
+            Follow.objects
+            .filter(suggestions_stale_at__isnull=False)
+            .order_by('suggestions_stale_at', 'pk')
+            .only('id', 'user_id', 'suggestions_stale_at')[:size]
+        )
+        if not batch:
+            break
+        for follow_obj in batch:
+            rows = compute_suggestions(follow_obj)
+            with transaction.atomic():
+                FollowSuggestion.objects.filter(user_id=follow_obj.user_id).delete()
+                FollowSuggestion.objects.bulk_create(rows)
+                # Only clear the flag if nothing re-marked this user while we were computing
+                Follow.objects.filter(pk=follow_obj.pk, suggestions_stale_at=follow_obj.suggestions_stale_at).update(
+                    suggestions_stale_at=None
+                )
+        refreshed += len(batch)
+
+    if refreshed:
+        logger.info(f"Refreshed follow suggestions for {refreshed} user(s).")
+    return refreshed
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ProfileDetailsView,UserPostDeleteView, userPostsView,EditProfileView,UserSearchView, FollowView, UnfollowView,FollowersView,FollowingView
+from .views import ProfileDetailsView,UserPostDeleteView, userPostsView,EditProfileView,UserSearchView, FollowView, UnfollowView,BulkFollowView,FollowersView,FollowingView,FollowSuggestionsView,FeedView
 
 urlpatterns = [
     path('details/', ProfileDetailsView.as_view(),name='profile_details'),
@@ -9,6 +9,9 @@ urlpatterns = [
     path('UserSearch/', UserSearchView.as_view(), name='user_search'),
     path('follow/', FollowView.as_view(), name='follow_user'),
     path('unfollow/', UnfollowView.as_view(), name='unfollow_user'),
+    path('bulk-follow/', BulkFollowView.as_view(), name='bulk_follow'),
     path('followers/', FollowersView.as_view(), name='followers'),
     path('following/', FollowingView.as_view(), name='following'),
+    path('suggestions/', FollowSuggestionsView.as_view(), name='follow_suggestions'),
+    path('feed/', FeedView.as_view(), name='feed'),
 ]   
\ No newline at end of file
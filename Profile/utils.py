@@ -0,0 +1,75 @@
+import time
+from urllib.parse import unquote, urlparse
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from vercel_blob import delete as del_
+
+from .models import Follow
+from .serializers import ProfileUpdateSerializer
+
+DEFAULT_PROFILE_PIC = "https://mphkxojdifbgafp1.public.blob.vercel-storage.com/Profile/p.webp"
+
+
+def replace_profile_pic(profile_obj, new_url):
+    """
+    Points the profile at an already-uploaded picture and deletes the previous blob
+    (never the shared default). Returns the serializer; check .errors when invalid.
+    """
+    old_profile_pic_url = profile_obj.profile_pic
+    serializer = ProfileUpdateSerializer(profile_obj, data={'profile_pic': new_url}, partial=True)
+    if serializer.is_valid():
+        if old_profile_pic_url and old_profile_pic_url not in (DEFAULT_PROFILE_PIC, new_url):
+            parsed_url = urlparse(old_profile_pic_url)
+            blob_path = unquote(parsed_url.path.lstrip('/'))
+            del_(blob_path)
+        serializer.save()
+        transaction.on_commit(lambda: invalidate_follow_lists_for_user(profile_obj.user_obj_id), robust=True)
+    return serializer
+
+
+# ==============================================================================
+# FOLLOW LIST CACHE
+# Followers/following pages are cached under a per-Follow version that is replaced
+# whenever that Follow gains or loses a link, or when someone listed on it changes
+# their name or avatar, so old pages are simply never read again and age out on
+# their own.
+# ==============================================================================
+
+FOLLOW_LIST_CACHE_SECONDS = 300
+
+
+def _follow_list_version_key(follow_pk):
+    return f"follow_list_version:{follow_pk}"
+
+
+def follow_list_cache_key(kind, follow_pk, cursor, page_size):
+    version_key = _follow_list_version_key(follow_pk)
+    version = cache.get(version_key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(version_key, version, timeout=None)
+        version = cache.get(version_key, version)
+    return f"follow_list:{kind}:{follow_pk}:{version}:{cursor or ''}:{page_size}"
+
+
+def invalidate_follow_lists(follow_pks):
+    version = time.time_ns()
+    cache.set_many({_follow_list_version_key(pk): version for pk in follow_pks}, timeout=None)
+
+
+def invalidate_follow_lists_for_user(user_id):
+    """
+    Drops the cached pages that show this user (everyone they follow or are followed by),
+    plus their own. Call after a name or avatar change.
+    """
+    follow_pk = Follow.objects.filter(user_id=user_id).values_list('pk', flat=True).first()
+    if follow_pk is None:
+        return
+    links = Follow.following.through.objects.filter(Q(from_follow_id=follow_pk) | Q(to_follow_id=follow_pk))
+    affected = {follow_pk}
+    for from_pk, to_pk in links.values_list('from_follow_id', 'to_follow_id').iterator():
+        affected.add(from_pk)
+        affected.add(to_pk)
+    invalidate_follow_lists(affected)
@@ -3,20 +3,36 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from Profile.serializers import (
-    CombinedProfileSerializer, UserPostsSerializer, ProfileUpdateSerializer, UserSearchSerializer
+    CombinedProfileSerializer, UserPostsSerializer, UserSearchSerializer, UserSearchValuesSerializer,
+    FollowerValuesSerializer, FollowingValuesSerializer, FollowSuggestionValuesSerializer,
 )
 from Profile.models import profile as ProfileModel
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, Value, When
 from urllib.parse import unquote, urlparse
 from home.models import AnsPdf, QuePdf
 from home.serializers import QuePdfSerializer
 from vercel_blob import delete as del_, put
 from user.authentication import CookieJWTAuthentication
 from user.utils import user_key
-from .models import Follow
+from .models import Follow, FollowSuggestion
+from .suggestions import SUGGESTION_KEEP
+from .feed import feed_page
+from .posts import user_posts_page, owned_posts, claim_legacy_posts
+from .signal import refresh_post_labels_task
+from .utils import replace_profile_pic, follow_list_cache_key, invalidate_follow_lists_for_user, FOLLOW_LIST_CACHE_SECONDS
 from django.core.cache import cache
 from django.views.decorators.cache import never_cache
 from django.utils.decorators import method_decorator
+from core.responses import streaming_json_response, cacheable_response
+from core.pagination import encode_cursor, decode_cursor
+
+FOLLOW_LIST_PAGE_SIZE = 20
+FOLLOW_LIST_MAX_PAGE_SIZE = 100
+BULK_FOLLOW_MAX_USERS = 100
+USER_POSTS_PAGE_SIZE = 20
+USER_POSTS_MAX_PAGE_SIZE = 50
 
 class ProfileDetailsView(APIView):
     authentication_classes = [CookieJWTAuthentication]
@@ -45,13 +61,10 @@ class ProfileDetailsView(APIView):
 
             serializer = CombinedProfileSerializer(profile_obj)
 
-            follow_obj = Follow.objects.only('id').filter(user=user).first()
-            if follow_obj:
-                follower_count = follow_obj.followers.count()
-                following_count = follow_obj.following.count()
-            else:
-                follower_count = 0
-                following_count = 0
+            # Denormalized on the Follow row (kept current by Profile/signal.py)
+            follower_count, following_count = (
+                Follow.objects.filter(user=user).values_list('follower_count', 'following_count').first() or (0, 0)
+            )
 
             data = serializer.data
             data['follower_count'] = follower_count
@@ -74,14 +87,23 @@ class userPostsView(APIView):
                     return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
             else:
                 user = request.user
-                username = user.username
+
+            # Paginated, merged stream when the client asks for pages (see posts.py)
+            cursor = request.data.get('cursor')
+            if cursor or request.data.get('page_size') is not None:
+                try:
+                    page_size = min(max(int(request.data.get('page_size') or USER_POSTS_PAGE_SIZE), 1), USER_POSTS_MAX_PAGE_SIZE)
+                    data = user_posts_page(user, cursor=cursor, page_size=page_size)
+                except (TypeError, ValueError) as e:
+                    return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                return Response(data, status=status.HTTP_200_OK)
 
             # Join in que_pdf to remove N+1 when accessing its fields [web:136]
-            posts = AnsPdf.objects.filter(name=username).select_related('que_pdf')
+            posts = owned_posts(AnsPdf, user).select_related('que_pdf')
             serializer = UserPostsSerializer(posts, many=True)
 
             # Also include notes/other PDFs from QuePdf
-            notes = QuePdf.objects.filter(username=username)
+            notes = owned_posts(QuePdf, user)
             qserializer_notes = QuePdfSerializer(notes, many=True)
 
             all_posts = []
@@ -114,10 +136,10 @@ class UserPostDeleteView(APIView):
             if not pdf_url:
                 return Response({"error": "PDF URL is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Try both models with minimal fields [web:27]
-            post = AnsPdf.objects.only('id', 'pdf').filter(pdf=pdf_url).first()
+            # Try both models with minimal fields [web:27]; only the owner's posts match
+            post = owned_posts(AnsPdf, request.user).only('id', 'pdf').filter(pdf=pdf_url).first()
             if post is None:
-                post = QuePdf.objects.only('id', 'pdf').filter(pdf=pdf_url).first()
+                post = owned_posts(QuePdf, request.user).only('id', 'pdf').filter(pdf=pdf_url).first()
 
             if not post:
                 return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -165,28 +187,25 @@ class EditProfileView(APIView):
             if new_username and new_username != username:
                 if User.objects.filter(username=new_username).exclude(id=user.id).only('id').exists():
                     return Response({"error": "Username already exists"}, status=status.HTTP_400_BAD_REQUEST)
-                # Bulk update related posts (same behavior, faster) [web:27]
-                AnsPdf.objects.filter(name=username).update(name=new_username)
-                QuePdf.objects.filter(username=username).update(username=new_username)
+                # Posts belong to the user through the author FK, so the rename itself touches
+                # no post rows; unlinked legacy rows are claimed while the old name still
+                # identifies them, and the labels shown on posts are refreshed in the background
+                claim_legacy_posts(user, username)
                 user.username = new_username
                 changed = True
 
             if changed:
                 user.save(update_fields=["first_name", "last_name", "username"] if new_username else ["first_name", "last_name"])
+            if new_username and new_username != username:
+                refresh_post_labels_task.apply_async(args=[user.id])
+            if changed:
+                # Followers/following pages embed the names
+                invalidate_follow_lists_for_user(user.id)
 
             if profile_pic:
-                old_profile_pic_url = profile_obj.profile_pic
                 blob = put(f"Profile/{profile_pic}", profile_pic.read())
-                new_profile_url = blob["url"]
-
-                serializer = ProfileUpdateSerializer(profile_obj, data={'profile_pic': new_profile_url}, partial=True)
-                if serializer.is_valid():
-                    if old_profile_pic_url != "https://mphkxojdifbgafp1.public.blob.vercel-storage.com/Profile/p.webp":
-                        parsed_url = urlparse(old_profile_pic_url)
-                        blob_path = unquote(parsed_url.path.lstrip('/'))
-                        del_(blob_path)
-                    serializer.save()
-                else:
+                serializer = replace_profile_pic(profile_obj, blob["url"])
+                if serializer.errors:
                     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
             cache.delete(user_key(user))
@@ -205,12 +224,63 @@ class UserSearchView(APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    MAX_PAGE_SIZE = 50
+
     def get(self, request):
         try:
-            # Limit columns for list view; serializer can still access these fields [web:27]
-            users = User.objects.only('id', 'username', 'first_name', 'last_name', 'email', 'date_joined')
-            serializer = UserSearchSerializer(users, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            query = (request.query_params.get("q") or "").strip()
+            if not query:
+                # One query (user columns + profile picture subquery), streamed rather than built as one list
+                rows = UserSearchValuesSerializer.iter_rows(User.objects.order_by('id'), chunk_size=2000)
+                return streaming_json_response(request, rows)
+
+            try:
+                page = max(int(request.query_params.get("page", 1)), 1)
+                page_size = min(max(int(request.query_params.get("page_size", 20)), 1), self.MAX_PAGE_SIZE)
+            except ValueError:
+                return Response({"error": "page and page_size must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Every word must appear in one of the name columns; served by the
+            # trigram (Postgres) / NOCASE (SQLite) indexes from Profile 0008.
+            match = Q()
+            for term in query.split()[:5]:
+                match &= Q(username__icontains=term) | Q(first_name__icontains=term) | Q(last_name__icontains=term)
+
+            # Username prefix hits first, then name prefix hits, then the rest
+            first = query.split()[0]
+            users = list(
+                User.objects
+                .filter(match)
+                .annotate(match_rank=Case(
+                    When(username__istartswith=first, then=Value(0)),
+                    When(Q(first_name__istartswith=first) | Q(last_name__istartswith=first), then=Value(1)),
+                    default=Value(2),
+                    output_field=IntegerField(),
+                ))
+                .order_by('match_rank', 'username')
+                .only('id', 'username', 'first_name', 'last_name', 'date_joined')
+                [(page - 1) * page_size:page * page_size + 1]  # one extra row to know whether another page exists
+            )
+            has_next = len(users) > page_size
+            users = users[:page_size]
+
+            # All profile pictures for the page in one query
+            profiles_by_user_id = {}
+            for prof in (
+                ProfileModel.objects
+                .filter(user_obj_id__in=[u.id for u in users])
+                .order_by('-id')
+                .only('id', 'user_obj_id', 'profile_pic', 'profile_pic_small')
+            ):
+                profiles_by_user_id[prof.user_obj_id] = prof  # lowest id wins, like the subquery above
+
+            data = UserSearchSerializer(users, many=True, context={'profiles_by_user_id': profiles_by_user_id}).data
+            return Response({
+                "results": data,
+                "page": page,
+                "page_size": page_size,
+                "has_next": has_next,
+            }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -272,29 +342,124 @@ class UnfollowView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class FollowersView(APIView):
+@method_decorator(never_cache, name="dispatch")
+class BulkFollowView(APIView):
+    """
+    POST {"usernames": [...], "action": "follow" | "unfollow"}. Resolves all usernames
+    in one query and applies them with a single add()/remove(), so the through table
+    sees one INSERT or DELETE and the follow signals (counters, list caches,
+    suggestions, notification digest) run once for the whole batch.
+    """
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         try:
-            username = request.data.get('username')
-            if username:
-                user = User.objects.only('id', 'username').filter(username=username).first()
-                if not user:
-                    return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
-            else:
-                user = request.user
+            user = request.user
+            action = request.data.get('action', 'follow')
+            usernames = request.data.get('usernames')
+            if action not in ('follow', 'unfollow'):
+                return Response({"error": "action must be 'follow' or 'unfollow'"}, status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(usernames, list) or not usernames or not all(isinstance(u, str) for u in usernames):
+                return Response({"error": "usernames must be a non-empty list of usernames"}, status=status.HTTP_400_BAD_REQUEST)
+            usernames = list(dict.fromkeys(u for u in usernames if u != user.username))
+            if len(usernames) > BULK_FOLLOW_MAX_USERS:
+                return Response({"error": f"At most {BULK_FOLLOW_MAX_USERS} usernames per request"}, status=status.HTTP_400_BAD_REQUEST)
+
+            targets = list(User.objects.only('id', 'username').filter(username__in=usernames))
+            found = {u.username for u in targets}
+            not_found = [u for u in usernames if u not in found]
+
+            with transaction.atomic():
+                if action == 'follow':
+                    user_follow_obj, _ = Follow.objects.get_or_create(user=user)
+                    # Users who never had a Follow row get one, in a single INSERT
+                    have_follow = set(Follow.objects.filter(user__in=targets).values_list('user_id', flat=True))
+                    Follow.objects.bulk_create(
+                        [Follow(user=u) for u in targets if u.id not in have_follow],
+                        ignore_conflicts=True,
+                    )
+                    target_follow_objs = list(Follow.objects.filter(user__in=targets).only('id', 'user_id'))
+                    if target_follow_objs:
+                        user_follow_obj.following.add(*target_follow_objs)
+                else:
+                    user_follow_obj = Follow.objects.filter(user=user).first()
+                    target_follow_objs = list(Follow.objects.filter(user__in=targets).only('id', 'user_id'))
+                    if user_follow_obj and target_follow_objs:
+                        user_follow_obj.following.remove(*target_follow_objs)
 
-            follow_obj = Follow.objects.filter(user=user).first()
-            if not follow_obj:
-                return Response({"error": "Follow object not found"}, status=status.HTTP_404_NOT_FOUND)
+            cache.delete_many([user_key(u) for u in [user, *targets]])
+            return Response({
+                "message": f"{user.username} {'followed' if action == 'follow' else 'unfollowed'} {len(targets)} user(s)",
+                "usernames": [u.username for u in targets],
+                "not_found": not_found,
+            }, status=status.HTTP_200_OK)
 
-            # M2M/reverse: use select_related on the FK in the through model to include related User efficiently [web:136]
-            followers = follow_obj.followers.select_related('user').all()
-            followers_users = [f.user for f in followers]
-            serializer = UserSearchSerializer(followers_users, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _follow_list_response(request, kind):
+    """
+    Shared body of FollowersView / FollowingView. With `page_size` or `cursor` in the
+    body the list is keyset-paginated over the follow links, newest first:
+    {"results", "next_cursor"}. Without either, the full list is returned as before.
+    Either way it is one query (users and profile pictures joined), cached until
+    either side of a link changes.
+    """
+    username = request.data.get('username')
+    if username:
+        user = User.objects.only('id', 'username').filter(username=username).first()
+        if not user:
+            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+    else:
+        user = request.user
+
+    follow_pk = Follow.objects.filter(user=user).values_list('pk', flat=True).first()
+    if follow_pk is None:
+        return Response({"error": "Follow object not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    cursor = request.data.get('cursor')
+    paginated = bool(cursor) or request.data.get('page_size') is not None
+    try:
+        page_size = min(max(int(request.data.get('page_size') or FOLLOW_LIST_PAGE_SIZE), 1), FOLLOW_LIST_MAX_PAGE_SIZE)
+        after = int(decode_cursor(cursor)) if cursor else None
+    except (TypeError, ValueError):
+        return Response({"error": "Invalid cursor or page_size"}, status=status.HTTP_400_BAD_REQUEST)
+
+    cache_key = follow_list_cache_key(kind, follow_pk, cursor, page_size if paginated else 'all')
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return Response(cached, status=status.HTTP_200_OK)
+
+    if kind == 'followers':
+        serializer, links = FollowerValuesSerializer, Follow.following.through.objects.filter(to_follow_id=follow_pk)
+    else:
+        serializer, links = FollowingValuesSerializer, Follow.following.through.objects.filter(from_follow_id=follow_pk)
+    links = links.order_by('-id')
+    if after is not None:
+        links = links.filter(id__lt=after)
+    if paginated:
+        links = links[:page_size + 1]  # one extra row to know whether another page exists
+
+    rows = list(serializer.iter_rows(links))
+    next_cursor = None
+    if paginated and len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]['link_id'])
+    for row in rows:
+        del row['link_id']
+
+    data = {"results": rows, "next_cursor": next_cursor} if paginated else rows
+    cache.set(cache_key, data, timeout=FOLLOW_LIST_CACHE_SECONDS)
+    return Response(data, status=status.HTTP_200_OK)
+
+class FollowersView(APIView):
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            return _follow_list_response(request, 'followers')
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -304,21 +469,45 @@ class FollowingView(APIView):
 
     def post(self, request):
         try:
-            username = request.data.get('username')
-            if username:
-                user = User.objects.only('id', 'username').filter(username=username).first()
-                if not user:
-                    return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
-            else:
-                user = request.user
+            return _follow_list_response(request, 'following')
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            follow_obj = Follow.objects.filter(user=user).first()
-            if not follow_obj:
-                return Response({"error": "Follow object not found"}, status=status.HTTP_404_NOT_FOUND)
+class FollowSuggestionsView(APIView):
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            try:
+                limit = min(max(int(request.query_params.get("limit", 10)), 1), SUGGESTION_KEEP)
+            except ValueError:
+                return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Precomputed by the refresh task; people followed since then are filtered out here
+            suggestions = (
+                FollowSuggestion.objects
+                .filter(user=request.user)
+                .exclude(suggested__follow__followers__user=request.user)
+                .order_by('-score', 'suggested_id')[:limit]
+            )
+            return cacheable_response(request, FollowSuggestionValuesSerializer.data(suggestions), max_age=0)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            following = follow_obj.following.select_related('user').all()
-            following_users = [f.user for f in following]
-            serializer = UserSearchSerializer(following_users, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+@method_decorator(never_cache, name="dispatch")
+class FeedView(APIView):
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_PAGE_SIZE = 50
+
+    def get(self, request):
+        try:
+            try:
+                page_size = min(max(int(request.query_params.get("page_size", 20)), 1), self.MAX_PAGE_SIZE)
+                data = feed_page(request.user, cursor=request.query_params.get("cursor"), page_size=page_size)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
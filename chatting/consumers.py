@@ -356,7 +356,7 @@ class MessageInboxConsumer(AsyncWebsocketConsumer):
             other_users = {u.id: u for u in User.objects.only('id', 'username').filter(id__in=unique_user_ids)}
             profiles = {
                 p.user_obj_id: p
-                for p in profile.objects.only('user_obj_id', 'profile_pic').filter(user_obj_id__in=unique_user_ids)
+                for p in profile.objects.only('user_obj_id', 'profile_pic', 'profile_pic_small').filter(user_obj_id__in=unique_user_ids)
             }
 
             inbox = []
@@ -365,7 +365,8 @@ class MessageInboxConsumer(AsyncWebsocketConsumer):
             for other_user_id in unique_user_ids:
                 other_user = other_users.get(other_user_id)
                 prof = profiles.get(other_user_id)
-                profile_pic = prof.profile_pic if prof else "https://mphkxojdifbgafp1.public.blob.vercel-storage.com/Profile/p.webp"
+                # Small avatar variant for the list; the original until it has been built
+                profile_pic = (prof.profile_pic_small or prof.profile_pic) if prof else "https://mphkxojdifbgafp1.public.blob.vercel-storage.com/Profile/p.webp"
 
                 latest_msg = (
                     Message.objects
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Message
+from core.serializers import ValuesSerializer
 
 class MessageSerializer(serializers.ModelSerializer):
     sender = serializers.CharField(source='sender.username', read_only=True)
@@ -18,3 +19,16 @@ class MessageSerializer(serializers.ModelSerializer):
             'seen_at'
         ]
         read_only_fields = ['id', 'sender', 'receiver', 'timestamp', 'is_seen', 'seen_at']  # faster as read-only where applicable [web:131]
+
+
+class MessageValuesSerializer(ValuesSerializer):
+    """values() fast path for MessageSerializer; the usernames are joined in the same query."""
+    fields = (
+        ('id', 'id'),
+        ('sender', 'sender__username'),
+        ('receiver', 'receiver__username'),
+        ('content', 'content'),
+        ('timestamp', 'timestamp'),
+        ('is_seen', 'is_seen'),
+        ('seen_at', 'seen_at'),
+    )
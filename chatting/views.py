@@ -9,7 +9,7 @@ from django.utils.decorators import method_decorator
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from .models import Message
-from .serializers import MessageSerializer
+from .serializers import MessageValuesSerializer
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 import hashlib
@@ -48,22 +48,21 @@ class ChatMessagesView(APIView):
                 logger.debug(f"[ChatMessagesView] Cache hit for {cache_key}")
                 return Response(cached)
 
-            # Select related sender/receiver to avoid N+1 in serializer if it accesses them [web:216]
+            # Sender/receiver usernames are joined into the values() query; no model instances built
             messages = (
                 Message.objects
                 .filter(Q(sender=sender, receiver=receiver) | Q(sender=receiver, receiver=sender))
-                .select_related('sender', 'receiver')
                 .order_by("timestamp")
             )
             if query:
                 messages = messages.filter(content__icontains=query)
 
-            serializer = MessageSerializer(messages, many=True)
+            data = MessageValuesSerializer.data(messages)
 
-            cache.set(cache_key, serializer.data, timeout=300)
+            cache.set(cache_key, data, timeout=300)
             logger.debug(f"[ChatMessagesView] Cache set for {cache_key}")
 
-            return Response(serializer.data)
+            return Response(data)
 
         except User.DoesNotExist:
             logger.error("[ChatMessagesView] Receiver not found")
@@ -0,0 +1,83 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from chatting.models import Message
+from chatting.serializers import MessageSerializer, MessageValuesSerializer
+from home.models import CourseList, QuePdf
+from home.serializers import QuePdfSerializer, QuePdfValuesSerializer
+from Profile.models import profile
+from Profile.serializers import UserSearchSerializer, UserSearchValuesSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the list endpoints' ModelSerializer path against the values()-based fast path: "
+        "rows/sec and peak Python memory. Seeds synthetic rows inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing runs per serializer.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options["rows"])
+                cases = [
+                    ("QuePdf", QuePdf.objects.order_by('id'),
+                     lambda qs: QuePdfSerializer(qs, many=True).data, QuePdfValuesSerializer.data),
+                    ("UserSearch", User.objects.order_by('id'),
+                     lambda qs: UserSearchSerializer(qs, many=True).data, UserSearchValuesSerializer.data),
+                    ("Message", Message.objects.select_related('sender', 'receiver').order_by('id'),
+                     lambda qs: MessageSerializer(qs, many=True).data, MessageValuesSerializer.data),
+                ]
+                for label, queryset, model_path, values_path in cases:
+                    expected = [dict(row) for row in model_path(queryset.all())]
+                    if values_path(queryset.all()) != expected:
+                        self.stderr.write(self.style.ERROR(f"{label}: values() output differs from the ModelSerializer output"))
+                    self._report(label, "ModelSerializer", queryset, model_path, options["repeat"])
+                    self._report(label, "values()", queryset, values_path, options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, n):
+        course = CourseList.objects.create(name="__bench_course__", number_sem=6)
+        User.objects.bulk_create([User(username=f"__bench_{i}", first_name="Bench", last_name=str(i)) for i in range(n)])
+        users = list(User.objects.filter(username__startswith="__bench_").order_by('id'))
+        profile.objects.bulk_create([profile(user_obj=u) for u in users], batch_size=1000)
+        QuePdf.objects.bulk_create([
+            QuePdf(course=course, pdf=f"https://bench.invalid/{i}.pdf", sem=1 + i % 6, div="all", year=2025,
+                   sub="Bench", name=f"Paper {i}", choose="exam_paper", username=users[i % len(users)].username)
+            for i in range(n)
+        ], batch_size=1000)
+        Message.objects.bulk_create([
+            Message(sender=users[i % len(users)], receiver=users[(i + 1) % len(users)], content=f"message {i}")
+            for i in range(n)
+        ], batch_size=1000)
+
+    def _report(self, label, path, queryset, fn, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(fn(queryset.all()))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        tracemalloc.start()
+        fn(queryset.all())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"{label:>10} {path:>16}: {rows} rows in {best:.3f}s "
+            f"({rows / best:,.0f} rows/s, peak {peak / 1024 / 1024:.1f} MiB)"
+        )
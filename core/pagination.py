@@ -0,0 +1,34 @@
+import base64
+import heapq
+import json
+from itertools import islice
+
+# ==============================================================================
+# KEYSET CURSORS
+# Opaque tokens for "everything after this row" pagination: the sort key of the
+# last row served, as URL-safe base64 JSON. Clients pass them back unchanged.
+# ==============================================================================
+
+
+def encode_cursor(position):
+    """Returns an opaque cursor for a JSON-serializable sort key (int, list, ...)."""
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def merge_sorted(sources, *, key, limit, reverse=False):
+    """
+    k-way merge of iterables that are each already sorted by `key` (descending when
+    reverse=True); returns the first `limit` items. Each source only needs to supply
+    `limit` items, so callers can fetch `[:limit]` per source and merge in memory.
+    """
+    return list(islice(heapq.merge(*sources, key=key, reverse=reverse), limit))
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import logging
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+READ_CACHE_SECONDS = 300  # same lifetime as CACHE_MIDDLEWARE_SECONDS
+STREAM_BATCH_ROWS = 500   # rows encoded per chunk written to the socket
+
+
+def _etag_for(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+    return quote_etag(hashlib.md5(body.encode("utf-8")).hexdigest())
+
+
+def _add_cache_headers(response, etag, max_age):
+    response["ETag"] = etag
+    patch_cache_control(response, max_age=max_age)
+    # Auth is a cookie, so any shared cache must key on it
+    patch_vary_headers(response, ["Cookie"])
+    return response
+
+
+def cacheable_response(request, data, *, max_age=READ_CACHE_SECONDS):
+    """
+    200 with ETag / Cache-Control / Vary for read-only GET endpoints, or a bare 304 when
+    the client's If-None-Match already matches. Lets browsers, the per-site cache
+    middleware and proxies reuse the body.
+    """
+    etag = _etag_for(data)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _add_cache_headers(not_modified, etag, max_age)
+    return _add_cache_headers(Response(data, status=status.HTTP_200_OK), etag, max_age)
+
+
+def deprecated_response(response, request, successor_params):
+    """Marks a POST-for-read response as deprecated and points at its GET replacement."""
+    response["Deprecation"] = "true"
+    params = urlencode({k: v for k, v in successor_params.items() if v is not None})
+    response["Link"] = f'<{request.path}?{params}>; rel="successor-version"'
+    return response
+
+
+def _json_array_chunks(rows, batch_rows):
+    """Encodes an iterable of dicts as one JSON array, a batch of rows per yielded chunk."""
+    # Same encoding as DRF's JSONRenderer (compact, unicode, strict) so clients see identical bytes
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    prefix, batch = "[", []
+    try:
+        for row in rows:
+            batch.append(encoder.encode(row))
+            if len(batch) >= batch_rows:
+                yield prefix + ",".join(batch)
+                prefix, batch = ",", []
+    except Exception as e:
+        # Headers are already sent; log and end the body so the truncated array fails to parse
+        logger.error(f"Streaming JSON response aborted: {e}")
+        return
+    yield prefix + ",".join(batch) + "]"
+
+
+def _as_async(chunks):
+    # Under ASGI, Django would drain a sync iterator into a list before sending anything;
+    # pull one chunk at a time on the sync thread (where the DB connection lives) instead.
+    next_chunk = sync_to_async(lambda: next(chunks, None), thread_sensitive=True)
+
+    async def stream():
+        while (chunk := await next_chunk()) is not None:
+            yield chunk
+    return stream()
+
+
+def streaming_json_response(request, rows, *, batch_rows=STREAM_BATCH_ROWS):
+    """
+    Streams `rows` (an iterable of dicts, e.g. ValuesSerializer.iter_rows(qs, chunk_size=...))
+    as a JSON array, so time-to-first-byte and peak memory don't grow with the table.
+    Streaming responses are skipped by the site cache and carry no ETag.
+    """
+    chunks = _json_array_chunks(rows, batch_rows)
+    django_request = getattr(request, "_request", request)
+    if isinstance(django_request, ASGIRequest):
+        chunks = _as_async(chunks)
+    return StreamingHttpResponse(chunks, status=status.HTTP_200_OK, content_type="application/json")
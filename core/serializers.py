@@ -0,0 +1,57 @@
+from rest_framework import serializers
+
+
+def datetime_format(output_format=None):
+    """Formatter matching DRF's DateTimeField output (timezone + ISO 8601 / `output_format`)."""
+    field = serializers.DateTimeField(format=output_format) if output_format else serializers.DateTimeField()
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for list endpoints: rows come straight from `.values_list()`,
+    so no model instances are built and no per-field serializer machinery runs.
+
+    Subclasses declare `fields` as (output_key, source) pairs, where source is an ORM
+    lookup ("course_id", "sender__username") or a query expression (Subquery, F, ...),
+    and optionally `formatters` {output_key: callable} for values that need the same
+    conversion the equivalent ModelSerializer field would apply (e.g. datetimes).
+    The output must stay identical to the ModelSerializer it stands in for.
+    """
+    fields = ()
+    formatters = {}
+
+    @classmethod
+    def _values(cls, queryset):
+        keys, lookups, annotations = [], [], {}
+        for key, source in cls.fields:
+            if isinstance(source, str):
+                lookups.append(source)
+            else:
+                alias = f"_values_{key}"
+                annotations[alias] = source
+                lookups.append(alias)
+            keys.append(key)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return keys, queryset.values_list(*lookups)
+
+    @classmethod
+    def iter_rows(cls, queryset, *, chunk_size=None):
+        """Yields one dict per row; with chunk_size the rows are streamed via .iterator()."""
+        keys, rows = cls._values(queryset)
+        if chunk_size:
+            rows = rows.iterator(chunk_size=chunk_size)
+        formatters = [(i, fn) for i, key in enumerate(keys) if (fn := cls.formatters.get(key))]
+
+        for row in rows:
+            if formatters:
+                row = list(row)
+                for i, fn in formatters:
+                    if row[i] is not None:
+                        row[i] = fn(row[i])
+            yield dict(zip(keys, row))
+
+    @classmethod
+    def data(cls, queryset):
+        return list(cls.iter_rows(queryset))
@@ -8,6 +8,7 @@ from django.conf import settings
 from django.core.management import call_command
 from django.db import connections, transaction
 from django.utils.timezone import now
+from home.uploads import purge_expired_upload_sessions
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,6 +36,13 @@ class ExpiredCleanupView(APIView):
             logger.error("Cache purge failed: %s", e, exc_info=True)
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        # Abandoned resumable uploads: session rows plus their temp part files
+        try:
+            details["upload_sessions_deleted"] = purge_expired_upload_sessions()
+        except Exception as e:
+            logger.error("Upload session purge failed: %s", e, exc_info=True)
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
         # Flush expired SimpleJWT tokens via management command (recommended) [web:200]
         try:
             call_command("flushexpiredtokens")
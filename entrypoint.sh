@@ -19,10 +19,26 @@ echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
 # ✅ Start Celery Worker in the background
+# Thread pool so notification chunks (and other I/O-bound tasks) run in parallel;
+# -B embeds beat for the periodic jobs in Pixel/celery.py (keep a single worker with -B)
 echo "Starting Celery worker..."
+celery -A Pixel worker -B \
+  -Q celery \
+  -n default@%h \
+  --loglevel=info \
+  --pool=threads \
+  --concurrency="${CELERY_CONCURRENCY:-4}" &
+
+# ✅ Start the media worker (PDF previews, avatar variants; see CELERY_TASK_ROUTES)
+# Prefork, not threads: pdfium is not thread-safe, and recycling the child
+# bounds the memory left behind by decoding large files
+echo "Starting Celery media worker..."
 celery -A Pixel worker \
+  -Q media \
+  -n media@%h \
   --loglevel=info \
-  --pool=solo \
+  --pool=prefork \
+  --concurrency="${CELERY_MEDIA_CONCURRENCY:-1}" \
   --max-tasks-per-child=5 \
   --max-memory-per-child=100000 &
 
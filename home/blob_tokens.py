@@ -0,0 +1,106 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+
+# ==============================================================================
+# VERCEL BLOB CLIENT TOKENS
+# Same format @vercel/blob's generateClientTokenFromReadWriteToken produces, so the
+# official client SDKs can upload straight to blob storage with a token we issue:
+#   vercel_blob_client_<storeId>_<base64("<hmac_sha256_hex(payload)>.<payload>")>
+# where payload is base64(JSON) and the HMAC key is the read-write token.
+# ==============================================================================
+
+
+def _read_write_token():
+    token = settings.VERCEL_BLOB_TOKEN
+    if not token:
+        raise ValueError("Vercel Blob token is missing. Please check your environment variables.")
+    return token
+
+
+def _store_id(rw_token):
+    # vercel_blob_rw_<storeId>_<secret>
+    parts = rw_token.split("_")
+    return parts[3] if len(parts) > 4 else ""
+
+
+def _sign(payload, key):
+    return hmac.new(key.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def generate_client_token(pathname, *, valid_until, allowed_content_types, maximum_size,
+                          callback_url=None, token_payload=None, rw_token=None):
+    """Returns a client token allowing exactly one upload to `pathname` until valid_until (epoch seconds)."""
+    rw_token = rw_token or _read_write_token()
+    claims = {
+        "pathname": pathname,
+        "validUntil": int(valid_until * 1000),
+        "allowedContentTypes": list(allowed_content_types),
+        "maximumSizeInBytes": maximum_size,
+        "addRandomSuffix": False,
+        "allowOverwrite": False,
+    }
+    if callback_url:
+        claims["onUploadCompleted"] = {"callbackUrl": callback_url, "tokenPayload": token_payload}
+    payload = base64.b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8")).decode("ascii")
+    secured = base64.b64encode(f"{_sign(payload, rw_token)}.{payload}".encode("ascii")).decode("ascii")
+    return f"vercel_blob_client_{_store_id(rw_token)}_{secured}"
+
+
+def verify_client_token(client_token, *, rw_token=None, now=None):
+    """Returns the token's claims, or raises ValueError if it is malformed, forged or expired."""
+    rw_token = rw_token or _read_write_token()
+    prefix = f"vercel_blob_client_{_store_id(rw_token)}_"
+    if not client_token.startswith(prefix):
+        raise ValueError("Not a client token for this store")
+    try:
+        signature, payload = base64.b64decode(client_token[len(prefix):]).decode("ascii").split(".", 1)
+        claims = json.loads(base64.b64decode(payload))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed client token: {e}")
+    if not hmac.compare_digest(signature, _sign(payload, rw_token)):
+        raise ValueError("Invalid client token signature")
+    if claims.get("validUntil", 0) < (now or time.time()) * 1000:
+        raise ValueError("Client token expired")
+    return claims
+
+
+# ==============================================================================
+# UPLOAD-COMPLETED CALLBACKS
+# Blob storage POSTs {"type": "blob.upload-completed", "payload": {...}} to the
+# token's callbackUrl, signed in x-vercel-signature with HMAC-SHA256 keyed by
+# sha256(read-write token).
+# ==============================================================================
+
+CALLBACK_SIGNATURE_HEADER = "x-vercel-signature"
+
+
+def sign_callback(body: bytes, *, rw_token=None):
+    key = hashlib.sha256((rw_token or _read_write_token()).encode("utf-8")).digest()
+    return hmac.new(key, body, hashlib.sha256).hexdigest()
+
+
+def verify_callback_signature(body: bytes, signature, *, rw_token=None):
+    return bool(signature) and hmac.compare_digest(signature, sign_callback(body, rw_token=rw_token))
+
+
+# ==============================================================================
+# URLS
+# ==============================================================================
+
+def public_blob_url(pathname, *, rw_token=None):
+    """Public URL a blob uploaded without a random suffix ends up at."""
+    base = settings.BLOB_PUBLIC_BASE_URL
+    if not base:
+        base = f"https://{_store_id(rw_token or _read_write_token()).lower()}.public.blob.vercel-storage.com"
+    return f"{base.rstrip('/')}/{quote(pathname)}"
+
+
+def blob_upload_url(pathname):
+    """Where a client PUTs the bytes for `pathname` with its client token."""
+    return f"{settings.BLOB_API_URL.rstrip('/')}/{quote(pathname)}"
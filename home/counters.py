@@ -0,0 +1,163 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connections, transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import QuePdf, QuePdfStat, PopularQuePdf
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# BUFFERED HIT COUNTERS
+# Hits are summed in an in-process buffer and flushed as aggregated deltas every
+# FLUSH_INTERVAL seconds (or sooner when the buffer grows past FLUSH_MAX_KEYS):
+# one UPDATE per distinct (field, delta) pair instead of one per hit. Each web
+# process keeps its own buffer; deltas are additive, so that is safe. A hard
+# crash loses at most one interval of hits, which is fine for popularity.
+# ==============================================================================
+
+COUNTER_FIELDS = {"view": "view_count", "download": "download_count"}
+FLUSH_INTERVAL = 30      # seconds
+FLUSH_MAX_KEYS = 5000    # distinct (paper, field) keys before an early flush
+
+_lock = threading.Lock()
+_buffer = Counter()      # (que_pdf_id, field) -> pending delta
+_wake = threading.Event()
+_flusher = None
+
+
+def record_hit(que_pdf_id, event):
+    """Counts one view/download; never touches the database on the request path."""
+    try:
+        field = COUNTER_FIELDS[event]
+    except KeyError:
+        raise ValueError(f"event must be one of: {', '.join(COUNTER_FIELDS)}")
+
+    with _lock:
+        _buffer[(int(que_pdf_id), field)] += 1
+        full = len(_buffer) >= FLUSH_MAX_KEYS
+    _ensure_flusher()
+    if full:
+        _wake.set()
+
+
+def flush_counters():
+    """Applies everything buffered so far; returns the number of hits written."""
+    global _buffer
+    with _lock:
+        pending, _buffer = _buffer, Counter()
+    if not pending:
+        return 0
+
+    try:
+        _apply(pending)
+    except Exception:
+        # Put the deltas back so the next flush retries them
+        with _lock:
+            _buffer.update(pending)
+        raise
+    return sum(pending.values())
+
+
+def _apply(pending):
+    # Hits for deleted / bogus ids are dropped rather than violating the FK
+    existing = set(QuePdf.objects.filter(pk__in={pk for pk, _ in pending}).values_list('pk', flat=True))
+
+    by_delta = defaultdict(list)  # (field, delta) -> [que_pdf_id, ...]
+    for (pk, field), delta in pending.items():
+        if pk in existing:
+            by_delta[(field, delta)].append(pk)
+    if not by_delta:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        QuePdfStat.objects.bulk_create([QuePdfStat(que_pdf_id=pk) for pk in existing], ignore_conflicts=True)
+        for (field, delta), pks in by_delta.items():
+            QuePdfStat.objects.filter(pk__in=pks).update(**{field: F(field) + delta, 'updated_at': now})
+    logger.debug(f"Flushed {len(pending)} counter deltas in {len(by_delta)} UPDATEs.")
+
+
+def _run_flusher():
+    while True:
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush_counters()
+        except Exception as e:
+            logger.error(f"Counter flush failed: {e}")
+        finally:
+            # This thread's connection would otherwise stay open for the life of the process
+            connections.close_all()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_run_flusher, name="que-pdf-counter-flusher", daemon=True)
+            _flusher.start()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush_counters()
+    except Exception as e:
+        logger.error(f"Counter flush at exit failed: {e}")
+
+
+# ==============================================================================
+# POPULARITY RANKING
+# Rebuilt from QuePdfStat on a schedule (see Pixel/celery.py), so the popular
+# endpoint reads a small precomputed table instead of sorting counters live.
+# ==============================================================================
+
+DOWNLOAD_WEIGHT = 3      # a download says more about a paper than opening it
+RANK_KEEP = 50           # rows kept per subject and per semester
+
+
+def recompute_popularity():
+    """Replaces PopularQuePdf with fresh subject/semester ranks; returns the row count."""
+    score = F('view_count') + DOWNLOAD_WEIGHT * F('download_count')
+    ranked = (
+        QuePdfStat.objects
+        .filter(Q(view_count__gt=0) | Q(download_count__gt=0))
+        .annotate(
+            score=score,
+            subject_rank=Window(
+                RowNumber(),
+                partition_by=[F('que_pdf__course_id'), F('que_pdf__sem'), F('que_pdf__sub')],
+                order_by=[score.desc(), F('que_pdf_id').desc()],
+            ),
+            semester_rank=Window(
+                RowNumber(),
+                partition_by=[F('que_pdf__course_id'), F('que_pdf__sem')],
+                order_by=[score.desc(), F('que_pdf_id').desc()],
+            ),
+        )
+        .filter(Q(subject_rank__lte=RANK_KEEP) | Q(semester_rank__lte=RANK_KEEP))
+        .values_list('que_pdf_id', 'que_pdf__course_id', 'que_pdf__sem', 'que_pdf__sub', 'score', 'subject_rank', 'semester_rank')
+    )
+
+    now = timezone.now()
+    rows = [
+        PopularQuePdf(
+            que_pdf_id=pk, course_id=course_id, sem=sem, sub=sub, score=score,
+            subject_rank=subject_rank, semester_rank=semester_rank, computed_at=now,
+        )
+        for pk, course_id, sem, sub, score, subject_rank, semester_rank in ranked
+    ]
+    with transaction.atomic():
+        PopularQuePdf.objects.all().delete()
+        PopularQuePdf.objects.bulk_create(rows, batch_size=1000)
+    logger.info(f"Recomputed popularity ranking: {len(rows)} rows.")
+    return len(rows)
@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q
+
+from home.models import QuePdf, AnsPdf
+from home.utils import build_pdf_preview, extract_pdf_metadata, extract_pdf_metadata_task
+
+
+class Command(BaseCommand):
+    help = "Backfill page count / size / first-page text / thumbnail for existing QuePdf and AnsPdf rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=["QuePdf", "AnsPdf", "all"], default="all")
+        parser.add_argument("--force", action="store_true", help="Re-extract rows that already have a preview.")
+        parser.add_argument("--sync", action="store_true", help="Extract inline instead of queueing Celery tasks.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--file",
+            help="Run extraction on a local PDF and print the result. Touches neither the database nor blob storage.",
+        )
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            return self._extract_local(options["file"])
+
+        models = [QuePdf, AnsPdf] if options["model"] == "all" else [{"QuePdf": QuePdf, "AnsPdf": AnsPdf}[options["model"]]]
+        for model in models:
+            self._backfill(model, force=options["force"], sync=options["sync"], batch_size=options["batch_size"])
+
+    def _extract_local(self, path):
+        file_path = Path(path)
+        if not file_path.is_file():
+            raise CommandError(f"No such file: {path}")
+
+        meta = extract_pdf_metadata(file_path.read_bytes())
+        thumbnail = meta.pop("thumbnail")
+        meta["thumbnail_bytes"] = len(thumbnail) if thumbnail else 0
+        self.stdout.write(json.dumps(meta, indent=2, ensure_ascii=False))
+
+    def _backfill(self, model, *, force, sync, batch_size):
+        name = model.__name__
+        qs = model.objects.filter(pdf__startswith="http")
+        if not force:
+            qs = qs.filter(~Q(preview_source=F("pdf")))
+
+        pks = qs.order_by("pk").values_list("pk", flat=True)
+        done = 0
+        for pk in pks.iterator(chunk_size=batch_size):
+            if sync:
+                try:
+                    build_pdf_preview(name, pk, force=force)
+                except Exception as e:
+                    self.stderr.write(f"{name} {pk}: {e}")
+                    continue
+            else:
+                extract_pdf_metadata_task.apply_async(args=[name, pk], kwargs={"force": force})
+            done += 1
+
+        verb = "Processed" if sync else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {done} {name} row(s)."))
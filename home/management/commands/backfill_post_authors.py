@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from home.models import QuePdf, AnsPdf
+
+
+class Command(BaseCommand):
+    help = "Fill QuePdf.author / AnsPdf.author from the username / name columns for rows that predate the FK."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be linked without writing.")
+
+    def handle(self, *args, **options):
+        for model, label_field in ((QuePdf, 'username'), (AnsPdf, 'name')):
+            checked, linked = self._backfill(model, label_field, options["batch_size"], options["dry_run"])
+            verb = "Would link" if options["dry_run"] else "Linked"
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__}: checked {checked} row(s) without an author. {verb} {linked}."
+            ))
+
+    def _backfill(self, model, label_field, batch_size, dry_run):
+        checked = linked = 0
+        last_pk = 0
+        while True:
+            # Keyset over pk; rows whose label matches no user stay NULL and are skipped next time round
+            batch = list(
+                model.objects
+                .filter(author__isnull=True, pk__gt=last_pk)
+                .order_by('pk')
+                .only('id', label_field)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            user_ids = dict(
+                User.objects.filter(username__in={getattr(row, label_field) for row in batch}).values_list('username', 'id')
+            )
+            matched = []
+            for row in batch:
+                user_id = user_ids.get(getattr(row, label_field))
+                if user_id:
+                    row.author_id = user_id
+                    matched.append(row)
+
+            if matched and not dry_run:
+                model.objects.bulk_update(matched, ['author'])
+            linked += len(matched)
+        return checked, linked
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from home import signal as notify
+
+
+class _StubBrevoHandler(BaseHTTPRequestHandler):
+    """Accepts POST /v3/smtp/email like Brevo does and counts delivered messages."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        versions = len(body.get("messageVersions") or []) or 1
+        with self.server.lock:
+            self.server.calls += 1
+            self.server.messages += versions
+        time.sleep(self.server.latency)
+
+        payload = {"messageIds": [f"<stub-{i}>" for i in range(versions)]} if versions > 1 else {"messageId": "<stub>"}
+        data = json.dumps(payload).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark new-QuePdf notification fan-out against a local stub of the Brevo API: "
+        "per-recipient render+send (old behaviour) vs render-once batched chunks in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=2000)
+        parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated provider round trip per call.")
+        parser.add_argument("--chunk-size", type=int, default=notify.NOTIFY_CHUNK_SIZE)
+        parser.add_argument("--workers", type=int, default=4, help="Parallel chunk senders (Celery worker concurrency).")
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubBrevoHandler)
+        server.lock = threading.Lock()
+        server.latency = options["latency_ms"] / 1000.0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        # Point the module's Brevo client at the stub for the duration of the run
+        old_host = notify.configuration.host
+        old_key = notify.configuration.api_key.get("api-key")
+        notify.configuration.host = f"http://127.0.0.1:{server.server_address[1]}/v3"
+        notify.configuration.api_key["api-key"] = "bench"
+
+        recipients = [[f"user{i}@example.com", f"user{i}"] for i in range(options["recipients"])]
+        instance = {"id": 0, "choose": "exam_paper", "sub": "Bench", "sem": 1, "name": "Bench paper", "div": "all"}
+        template = "que_pdf_notification/que_pdf_notification.html"
+
+        try:
+            self._run("per-recipient", server, lambda: self._per_recipient(recipients, instance, template))
+            self._run("batched", server, lambda: self._batched(recipients, instance, template, options))
+        finally:
+            notify.configuration.host = old_host
+            if old_key is None:
+                notify.configuration.api_key.pop("api-key", None)
+            else:
+                notify.configuration.api_key["api-key"] = old_key
+            server.shutdown()
+
+    def _run(self, label, server, fn):
+        server.calls = server.messages = 0
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label:>14}: {server.messages} emails in {elapsed:.2f}s "
+            f"({server.messages / elapsed:,.0f} emails/s, {server.calls} API calls)"
+        )
+
+    def _per_recipient(self, recipients, instance, template):
+        for email, username in recipients:
+            notify._send_templated_email(
+                subject="Bench",
+                to_email=email,
+                html_template=template,
+                context={"instance": instance, "user": {"username": username}, "pdf_link": "", "heading": "Exam Paper"},
+                plain_fallback=f"Hello {username}",
+            )
+
+    def _batched(self, recipients, instance, template, options):
+        html_message = render_to_string(template, {
+            "instance": instance,
+            "user": {"username": notify.USERNAME_PLACEHOLDER},
+            "pdf_link": "",
+            "heading": "Exam Paper",
+        })
+        plain_fallback = f"Hello {notify.USERNAME_PLACEHOLDER}"
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = [
+                pool.submit(
+                    notify._send_batch_templated_email,
+                    subject="Bench",
+                    recipients=chunk,
+                    html_message=html_message,
+                    plain_fallback=plain_fallback,
+                )
+                for chunk in notify._chunked(recipients, options["chunk_size"])
+            ]
+            for future in futures:
+                future.result()
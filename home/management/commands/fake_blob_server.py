@@ -0,0 +1,143 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from home.blob_tokens import CALLBACK_SIGNATURE_HEADER, sign_callback, verify_client_token
+
+
+class _FakeBlobHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for blob storage: PUT /<pathname> with a client token (or the
+    read-write token), GET/HEAD /<pathname> to read it back, and the signed
+    upload-completed callback when the token asks for one.
+    """
+
+    def _pathname(self):
+        return unquote(urlparse(self.path).path.lstrip("/"))
+
+    def _json(self, code, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_PUT(self):
+        pathname = self._pathname()
+        token = (self.headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        content_type = self.headers.get("x-content-type") or self.headers.get("Content-Type") or "application/octet-stream"
+
+        claims = {}
+        if token != self.server.rw_token:
+            try:
+                claims = verify_client_token(token, rw_token=self.server.rw_token)
+            except ValueError as e:
+                return self._json(403, {"error": {"code": "forbidden", "message": str(e)}})
+            if claims["pathname"] != pathname:
+                return self._json(403, {"error": {"code": "forbidden", "message": "Token not valid for this pathname"}})
+            if claims.get("allowedContentTypes") and content_type not in claims["allowedContentTypes"]:
+                return self._json(400, {"error": {"code": "bad_request", "message": f"Content type {content_type} not allowed"}})
+            if len(body) > claims.get("maximumSizeInBytes", len(body)):
+                return self._json(400, {"error": {"code": "bad_request", "message": "File too large"}})
+            if not claims.get("allowOverwrite") and pathname in self.server.blobs:
+                return self._json(409, {"error": {"code": "bad_request", "message": "Blob already exists"}})
+
+        with self.server.lock:
+            self.server.blobs[pathname] = (body, content_type)
+
+        result = {
+            "url": f"{self.server.base_url}/{self.path.lstrip('/')}",
+            "downloadUrl": f"{self.server.base_url}/{self.path.lstrip('/')}?download=1",
+            "pathname": pathname,
+            "contentType": content_type,
+            "contentDisposition": f'inline; filename="{pathname.rsplit("/", 1)[-1]}"',
+        }
+        self.server.log(f"PUT {pathname} ({len(body)} bytes, {content_type})")
+        self._json(200, result)
+
+        callback = claims.get("onUploadCompleted")
+        if callback and self.server.callbacks:
+            threading.Thread(target=self.server.send_callback, args=(callback, result), daemon=True).start()
+
+    def _serve(self, with_body):
+        blob = self.server.blobs.get(self._pathname())
+        if not blob:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, content_type = blob
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._serve(True)
+
+    def do_HEAD(self):
+        self._serve(False)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local fake blob storage server for direct-upload development and tests. "
+        "Set BLOB_API_URL and BLOB_PUBLIC_BASE_URL to the printed address on the Django side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=9010)
+        parser.add_argument("--no-callbacks", action="store_true", help="Don't POST upload-completed callbacks.")
+
+    def handle(self, *args, **options):
+        rw_token = settings.VERCEL_BLOB_TOKEN
+        if not rw_token:
+            raise CommandError("BLOB_READ_WRITE_TOKEN must be set (any vercel_blob_rw_<store>_<secret> value works locally).")
+
+        server = ThreadingHTTPServer((options["host"], options["port"]), _FakeBlobHandler)
+        server.rw_token = rw_token
+        server.base_url = f"http://{options['host']}:{server.server_address[1]}"
+        server.blobs = {}
+        server.lock = threading.Lock()
+        server.callbacks = not options["no_callbacks"]
+        server.log = lambda msg: self.stdout.write(msg)
+
+        def send_callback(callback, blob):
+            body = json.dumps({
+                "type": "blob.upload-completed",
+                "payload": {"blob": blob, "tokenPayload": callback.get("tokenPayload")},
+            }).encode()
+            try:
+                resp = requests.post(
+                    callback["callbackUrl"],
+                    data=body,
+                    headers={"Content-Type": "application/json", CALLBACK_SIGNATURE_HEADER: sign_callback(body, rw_token=rw_token)},
+                    timeout=10,
+                )
+                self.stdout.write(f"Callback {callback['callbackUrl']} -> {resp.status_code}")
+            except requests.RequestException as e:
+                self.stderr.write(f"Callback {callback['callbackUrl']} failed: {e}")
+
+        server.send_callback = send_callback
+
+        self.stdout.write(self.style.SUCCESS(f"Fake blob server on {server.base_url}"))
+        self.stdout.write(f"  BLOB_API_URL={server.base_url} BLOB_PUBLIC_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,155 @@
+import csv
+import json
+from datetime import date
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from home.models import CourseList, QuePdf, Subject, normalize_course_name
+from home.signal import que_pdfs_bulk_created
+from home.uploads import bulk_create_que_pdfs
+from home.utils import unique_blob_path, upload_blobs_concurrently
+
+REQUIRED_COLUMNS = ("file", "course", "sem", "sub", "name", "choose")
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import question papers / notes from a CSV or JSON manifest plus a directory of PDFs. "
+        "Manifest columns: file, course, sem, sub, name, choose[, year, div, username]."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--manifest", required=True, help="Path to a .csv or .json manifest.")
+        parser.add_argument("--pdf-dir", required=True, help="Directory the manifest's `file` column is relative to.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Blob uploads in flight at once.")
+        parser.add_argument("--username", default="admin", help="Uploader recorded on rows without a username column.")
+        parser.add_argument("--no-subjects", action="store_true", help="Don't create missing Subject rows.")
+        parser.add_argument("--no-notify", action="store_true", help="Skip the per-course summary emails.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate the manifest only; upload and insert nothing.")
+
+    def handle(self, *args, **options):
+        pdf_dir = Path(options["pdf_dir"])
+        if not pdf_dir.is_dir():
+            raise CommandError(f"Not a directory: {pdf_dir}")
+
+        rows = self._read_manifest(Path(options["manifest"]))
+        objects, files = self._build_rows(rows, pdf_dir, options["username"])
+        self.stdout.write(f"Manifest OK: {len(objects)} row(s).")
+        if options["dry_run"]:
+            return
+
+        # Upload first (bounded concurrency); only rows whose blob landed get inserted.
+        # Unique paths: manifests may repeat a file name, and the pk fallback in
+        # bulk_create_que_pdfs matches rows by URL
+        results = upload_blobs_concurrently(
+            [
+                (unique_blob_path(f"QuePdf/{obj.choose}/sem {obj.sem}/{path.name}"), path.read_bytes)
+                for obj, path in zip(objects, files)
+            ],
+            max_workers=options["concurrency"],
+        )
+        uploaded = []
+        for obj, path, (url, error) in zip(objects, files, results):
+            if error:
+                self.stderr.write(f"Upload failed for {path.name}: {error}")
+                continue
+            obj.pdf = url
+            uploaded.append(obj)
+
+        if not uploaded:
+            raise CommandError("No files were uploaded; nothing imported.")
+
+        with transaction.atomic():
+            created = bulk_create_que_pdfs(uploaded)
+
+            subjects = 0 if options["no_subjects"] else self._create_missing_subjects(created)
+            que_pdfs_bulk_created.send(sender=QuePdf, instances=created, notify=not options["no_notify"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {len(created)} QuePdf row(s), created {subjects} Subject row(s), "
+            f"{len(objects) - len(uploaded)} upload failure(s)."
+        ))
+
+    # --------------------------------------------------------------------------
+
+    def _read_manifest(self, path):
+        if not path.is_file():
+            raise CommandError(f"No such manifest: {path}")
+        if path.suffix.lower() == ".json":
+            rows = json.loads(path.read_text(encoding="utf-8"))
+            if not isinstance(rows, list):
+                raise CommandError("JSON manifest must be a list of objects.")
+            return rows
+        if path.suffix.lower() == ".csv":
+            with path.open(newline="", encoding="utf-8-sig") as fh:
+                return list(csv.DictReader(fh))
+        raise CommandError("Manifest must be a .csv or .json file.")
+
+    def _build_rows(self, rows, pdf_dir, default_username):
+        courses = {normalize_course_name(name): pk for pk, name in CourseList.objects.values_list('id', 'name')}
+        objects, files, errors = [], [], []
+
+        for line, row in enumerate(rows, start=1):
+            missing = [col for col in REQUIRED_COLUMNS if not str(row.get(col) or "").strip()]
+            if missing:
+                errors.append(f"row {line}: missing {', '.join(missing)}")
+                continue
+
+            path = pdf_dir / str(row["file"]).strip()
+            if not path.is_file():
+                errors.append(f"row {line}: file not found: {path}")
+                continue
+
+            course_id = courses.get(normalize_course_name(str(row["course"])))
+            if not course_id:
+                errors.append(f"row {line}: unknown course {row['course']!r}")
+                continue
+
+            try:
+                obj = QuePdf(
+                    course_id=course_id,
+                    pdf="https://pending.invalid/",  # replaced by the blob URL after upload
+                    sem=int(row["sem"]),
+                    year=int(row.get("year") or date.today().year),
+                    div=str(row.get("div") or "all").strip(),
+                    sub=str(row["sub"]).strip(),
+                    name=str(row["name"]).strip(),
+                    choose=str(row["choose"]).strip(),
+                    username=str(row.get("username") or default_username).strip(),
+                )
+                obj.clean_fields(exclude=["course"])
+            except (ValueError, ValidationError) as e:
+                errors.append(f"row {line}: {e}")
+                continue
+
+            objects.append(obj)
+            files.append(path)
+
+        if errors:
+            raise CommandError("Manifest has errors:\n  " + "\n  ".join(errors))
+        if not objects:
+            raise CommandError("Manifest is empty.")
+
+        # Link rows to their uploader's account where one exists (one lookup for the whole manifest)
+        user_ids = dict(User.objects.filter(username__in={obj.username for obj in objects}).values_list('username', 'id'))
+        for obj in objects:
+            obj.author_id = user_ids.get(obj.username)
+        return objects, files
+
+    def _create_missing_subjects(self, que_pdfs):
+        wanted = {(obj.course_id, obj.sem, obj.sub) for obj in que_pdfs}
+        existing = set(
+            Subject.objects
+            .filter(course_obj_id__in={c for c, _, _ in wanted})
+            .values_list('course_obj_id', 'sem', 'name')
+        )
+        missing = [
+            Subject(course_obj_id=course_id, sem=sem, name=name)
+            for course_id, sem, name in sorted(wanted - existing)
+        ]
+        Subject.objects.bulk_create(missing, batch_size=500)
+        return len(missing)
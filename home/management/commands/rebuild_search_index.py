@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from home.models import QuePdf, SearchDocument
+from home.search import index_que_pdf, rebuild_fts_table
+
+
+class Command(BaseCommand):
+    help = "Rebuild the QuePdf full-text search documents (and the SQLite FTS5 table)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        # Drop documents whose QuePdf is gone, then rebuild the rest
+        SearchDocument.objects.exclude(que_pdf_id__in=QuePdf.objects.values('id')).delete()
+
+        done = 0
+        for pk in QuePdf.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=options["batch_size"]):
+            index_que_pdf(pk)
+            done += 1
+
+        rebuild_fts_table()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {done} QuePdf row(s)."))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max
+
+from home.models import QuePdf
+
+
+class Command(BaseCommand):
+    help = "Recompute QuePdf.answer_count / last_answer_at from AnsPdf and fix rows that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        checked = fixed = 0
+        last_pk = 0
+
+        while True:
+            # Keyset over pk so each batch is one aggregate query
+            batch = list(
+                QuePdf.objects
+                .filter(pk__gt=last_pk)
+                .order_by('pk')
+                .annotate(actual_count=Count('answers'), actual_last=Max('answers__created_at'))
+                .only('id', 'answer_count', 'last_answer_at')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            drifted = []
+            for row in batch:
+                if row.answer_count != row.actual_count or row.last_answer_at != row.actual_last:
+                    row.answer_count = row.actual_count
+                    row.last_answer_at = row.actual_last
+                    drifted.append(row)
+
+            if drifted and not options["dry_run"]:
+                QuePdf.objects.bulk_update(drifted, ['answer_count', 'last_answer_at'])
+            fixed += len(drifted)
+
+        verb = "Would fix" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} QuePdf row(s). {verb} {fixed}."))
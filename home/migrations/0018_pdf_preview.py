@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0017_quepdf_username_alter_anspdf_name_alter_anspdf_pdf_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anspdf',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='anspdf',
+            name='first_page_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='anspdf',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='anspdf',
+            name='preview_extracted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='anspdf',
+            name='preview_source',
+            field=models.URLField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='anspdf',
+            name='thumbnail',
+            field=models.URLField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='first_page_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='preview_extracted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='preview_source',
+            field=models.URLField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='thumbnail',
+            field=models.URLField(blank=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE home_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX home_searchdoc_vector_gin ON home_searchdocument USING GIN (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS home_searchdoc_vector_gin",
+    "ALTER TABLE home_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+# External-content FTS5 table kept in sync with home_searchdocument by triggers;
+# rowid is que_pdf_id (an INTEGER PRIMARY KEY, i.e. the rowid alias).
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE home_searchdocument_fts USING fts5(
+        title, body, content='home_searchdocument', content_rowid='que_pdf_id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER home_searchdocument_ai AFTER INSERT ON home_searchdocument BEGIN
+        INSERT INTO home_searchdocument_fts(rowid, title, body) VALUES (new.que_pdf_id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER home_searchdocument_ad AFTER DELETE ON home_searchdocument BEGIN
+        INSERT INTO home_searchdocument_fts(home_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.que_pdf_id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER home_searchdocument_au AFTER UPDATE ON home_searchdocument BEGIN
+        INSERT INTO home_searchdocument_fts(home_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.que_pdf_id, old.title, old.body);
+        INSERT INTO home_searchdocument_fts(rowid, title, body) VALUES (new.que_pdf_id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS home_searchdocument_au",
+    "DROP TRIGGER IF EXISTS home_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS home_searchdocument_ai",
+    "DROP TABLE IF EXISTS home_searchdocument_fts",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_FORWARD)
+    # Other backends fall back to substring matching (home/search.py)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_REVERSE)
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0018_pdf_preview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('que_pdf', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='home.quepdf')),
+                ('title', models.TextField(blank=True, default='')),
+                ('body', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:34
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_answer_counts(apps, schema_editor):
+    QuePdf = apps.get_model('home', 'QuePdf')
+    AnsPdf = apps.get_model('home', 'AnsPdf')
+    counts = (
+        AnsPdf.objects
+        .filter(que_pdf_id=OuterRef('pk'))
+        .order_by()
+        .values('que_pdf_id')
+        .annotate(c=Count('id'))
+        .values('c')
+    )
+    # Single correlated UPDATE; last_answer_at stays NULL since old answers have no timestamp
+    QuePdf.objects.update(answer_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0019_search_document'),
+    ]
+
+    operations = [
+        # Added without a default first so existing answers keep NULL instead of "now"
+        migrations.AddField(
+            model_name='anspdf',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='anspdf',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='answer_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quepdf',
+            name='last_answer_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_answer_counts, migrations.RunPython.noop),
+    ]
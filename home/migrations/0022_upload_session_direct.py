@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0021_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='mode',
+            field=models.CharField(choices=[('chunked', 'Chunked via server'), ('direct', 'Direct to blob')], default='chunked', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='pathname',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='result_id',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='kind',
+            field=models.CharField(choices=[('que', 'QuePdf'), ('ans', 'AnsPdf'), ('avatar', 'Profile picture')], max_length=6),
+        ),
+    ]
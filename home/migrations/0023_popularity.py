@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0022_upload_session_direct'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuePdfStat',
+            fields=[
+                ('que_pdf', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='home.quepdf')),
+                ('view_count', models.PositiveBigIntegerField(default=0)),
+                ('download_count', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PopularQuePdf',
+            fields=[
+                ('que_pdf', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='home.quepdf')),
+                ('sem', models.IntegerField()),
+                ('sub', models.CharField(max_length=100)),
+                ('score', models.FloatField()),
+                ('subject_rank', models.PositiveIntegerField()),
+                ('semester_rank', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='home.courselist')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'sem', 'sub', 'subject_rank'], name='home_popula_course__98d9f2_idx'), models.Index(fields=['course', 'sem', 'semester_rank'], name='home_popula_course__88e472_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_catalog_changes(apps, schema_editor):
+    """One upsert entry per existing row, so syncing from version 0 is a full catalog download."""
+    CatalogChange = apps.get_model('home', 'CatalogChange')
+    CatalogSyncState = apps.get_model('home', 'CatalogSyncState')
+    sources = [
+        ('course', apps.get_model('home', 'CourseList')),
+        ('subject', apps.get_model('home', 'Subject')),
+        ('que_pdf', apps.get_model('home', 'QuePdf')),
+        ('ans_pdf', apps.get_model('home', 'AnsPdf')),
+    ]
+    for key, model in sources:
+        batch = []
+        for pk in model.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=2000):
+            batch.append(CatalogChange(model=key, object_id=pk, op='upsert'))
+            if len(batch) >= 2000:
+                CatalogChange.objects.bulk_create(batch)
+                batch = []
+        CatalogChange.objects.bulk_create(batch)
+    CatalogSyncState.objects.get_or_create(id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0023_popularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSyncState',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('floor', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('course', 'CourseList'), ('subject', 'Subject'), ('que_pdf', 'QuePdf'), ('ans_pdf', 'AnsPdf')], max_length=10)),
+                ('object_id', models.IntegerField()),
+                ('op', models.CharField(choices=[('upsert', 'Insert / update'), ('delete', 'Delete')], max_length=6)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'object_id'], name='home_catalo_model_cebc46_idx'), models.Index(fields=['op', 'created_at'], name='home_catalo_op_4c7fb9_idx')],
+            },
+        ),
+        migrations.RunPython(seed_catalog_changes, migrations.RunPython.noop),
+    ]
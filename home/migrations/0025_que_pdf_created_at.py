@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0024_catalog_changes'),
+    ]
+
+    operations = [
+        # Existing rows stay NULL (their upload time is unknown); only new rows get now()
+        migrations.AddField(
+            model_name='quepdf',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='quepdf',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, null=True),
+        ),
+    ]
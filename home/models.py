@@ -1,4 +1,8 @@
 from django.db import models
+from django.conf import settings
+from django.utils import timezone
+import re
+import uuid
 from datetime import datetime
 import pytz
 
@@ -11,6 +15,10 @@ def get_current_time():
 def get_current_date():
     return datetime.today().strftime("%Y-%m-%d")
 
+# Canonical form used to match free-text course names ("B.C.A", "bca", "BCA ") to CourseList
+def normalize_course_name(name):
+    return re.sub(r"[^0-9a-z]", "", (name or "").lower())
+
 # Model of Course List
 class CourseList(models.Model):
     id = models.AutoField(primary_key=True)
@@ -25,8 +33,21 @@ class CourseList(models.Model):
             models.Index(fields=['name']),  # explicit even with unique for clarity [web:27]
         ]
 
+# Preview metadata shared by QuePdf and AnsPdf; filled in by the background extraction task
+class PdfPreview(models.Model):
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)  # bytes
+    first_page_text = models.TextField(blank=True, default="")
+    thumbnail = models.URLField(max_length=255, blank=True, default="")
+    # pdf URL the preview was built from; lets the task skip rows that are already up to date
+    preview_source = models.URLField(max_length=255, blank=True, default="")
+    preview_extracted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
 # Model of QuePdf
-class QuePdf(models.Model):
+class QuePdf(PdfPreview):
     id = models.AutoField(primary_key=True)
     course = models.ForeignKey(CourseList, on_delete=models.CASCADE, related_name='que_pdfs', db_index=True)  # join speed [web:27]
     pdf = models.URLField(max_length=255)
@@ -39,6 +60,15 @@ class QuePdf(models.Model):
     name = models.CharField(max_length=255, db_index=True)  # frequently filtered/ordered [web:27]
     choose = models.CharField(max_length=40, db_index=True)  # category selection filters [web:27]
     username = models.CharField(max_length=255, db_index=True)  # owner filters [web:27]
+    # Owner; `username` is kept as the display label. Null for rows not yet backfilled (backfill_post_authors)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, db_index=True, related_name='que_pdfs',
+    )
+    # Denormalized from AnsPdf by signals (home/signal.py); reconcile_answer_counts repairs drift
+    answer_count = models.PositiveIntegerField(default=0)
+    last_answer_at = models.DateTimeField(null=True, blank=True)
+    # Null for papers uploaded before this column existed
+    created_at = models.DateTimeField(default=timezone.now, null=True, db_index=True)
 
     def __str__(self):
         return f"{self.course} - Sem {self.sem} - {self.div} - Year {self.year} - {self.name}"
@@ -50,11 +80,17 @@ class QuePdf(models.Model):
         ]
 
 # Model of AnsPdf
-class AnsPdf(models.Model):
+class AnsPdf(PdfPreview):
     que_pdf = models.ForeignKey(QuePdf, on_delete=models.CASCADE, related_name='answers', db_index=True)  # FK join speed [web:27]
     name = models.CharField(max_length=255, db_index=True)  # list by user name [web:27]
+    # Owner; `name` is kept as the display label. Null for rows not yet backfilled (backfill_post_authors)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, db_index=True, related_name='ans_pdfs',
+    )
     contant = models.TextField()
     pdf = models.URLField(max_length=255, default="Admin")
+    # Null for answers uploaded before this column existed
+    created_at = models.DateTimeField(default=timezone.now, null=True, db_index=True)
 
     class Meta:
         indexes = [
@@ -76,3 +112,123 @@ class Subject(models.Model):
         indexes = [
             models.Index(fields=['course_obj', 'sem', 'name']),  # used by subject listing per course/sem [web:27]
         ]
+
+# Denormalized search text per QuePdf (its own fields, its answers and extracted PDF text).
+# The vendor-specific index lives next to this table: a generated tsvector + GIN index on
+# Postgres, an external-content FTS5 table on SQLite (see migration 0019).
+class SearchDocument(models.Model):
+    que_pdf = models.OneToOneField(QuePdf, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    title = models.TextField(blank=True, default="")
+    body = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"SearchDocument(que_pdf={self.que_pdf_id})"
+
+
+# Upload in progress (see uploads.py). Chunked: bytes accumulate in a local temp file and
+# only the finalize step pushes them to blob storage. Direct: the client uploads straight
+# to blob storage with a client token and we only create the row on confirm/callback.
+class UploadSession(models.Model):
+    KIND_QUE = 'que'
+    KIND_ANS = 'ans'
+    KIND_AVATAR = 'avatar'
+    KIND_CHOICES = [(KIND_QUE, 'QuePdf'), (KIND_ANS, 'AnsPdf'), (KIND_AVATAR, 'Profile picture')]
+
+    MODE_CHUNKED = 'chunked'
+    MODE_DIRECT = 'direct'
+    MODE_CHOICES = [(MODE_CHUNKED, 'Chunked via server'), (MODE_DIRECT, 'Direct to blob')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    kind = models.CharField(max_length=6, choices=KIND_CHOICES)
+    mode = models.CharField(max_length=7, choices=MODE_CHOICES, default=MODE_CHUNKED)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()                  # total bytes declared at create
+    offset = models.PositiveBigIntegerField(default=0)       # bytes received so far
+    metadata = models.JSONField(default=dict, blank=True)    # validated row fields, applied at finalize
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)         # pushed forward on every chunk
+    pathname = models.CharField(max_length=255, blank=True, default="")  # direct: the only blob path the token allows
+    completed_at = models.DateTimeField(null=True, blank=True)
+    result_id = models.IntegerField(null=True, blank=True)   # pk of the row created on completion
+
+    def __str__(self):
+        return f"UploadSession({self.kind}, {self.filename}, {self.offset}/{self.size})"
+
+
+# View / download totals per paper. Written only by counters.flush_counters, which
+# applies buffered deltas in bulk instead of one UPDATE per hit.
+class QuePdfStat(models.Model):
+    que_pdf = models.OneToOneField(QuePdf, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    view_count = models.PositiveBigIntegerField(default=0)
+    download_count = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"QuePdfStat({self.que_pdf_id}: {self.view_count} views, {self.download_count} downloads)"
+
+
+# Periodically recomputed ranking (counters.recompute_popularity); course/sem/sub are
+# copied from QuePdf so "popular in this subject/semester" is a single index range scan.
+class PopularQuePdf(models.Model):
+    que_pdf = models.OneToOneField(QuePdf, on_delete=models.CASCADE, primary_key=True, related_name='popularity')
+    course = models.ForeignKey(CourseList, on_delete=models.CASCADE, related_name='+')
+    sem = models.IntegerField()
+    sub = models.CharField(max_length=100)
+    score = models.FloatField()
+    subject_rank = models.PositiveIntegerField()   # 1 = most popular within (course, sem, sub)
+    semester_rank = models.PositiveIntegerField()  # 1 = most popular within (course, sem)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'sem', 'sub', 'subject_rank']),
+            models.Index(fields=['course', 'sem', 'semester_rank']),
+        ]
+
+    def __str__(self):
+        return f"PopularQuePdf({self.que_pdf_id}, #{self.subject_rank} in {self.sub})"
+
+
+# Append-only change log for the offline catalog (sync.py). The auto-incrementing id is
+# the version clients sync from; rows are written by the signals in signal.py.
+class CatalogChange(models.Model):
+    MODEL_COURSE = 'course'
+    MODEL_SUBJECT = 'subject'
+    MODEL_QUE_PDF = 'que_pdf'
+    MODEL_ANS_PDF = 'ans_pdf'
+    MODEL_CHOICES = [
+        (MODEL_COURSE, 'CourseList'),
+        (MODEL_SUBJECT, 'Subject'),
+        (MODEL_QUE_PDF, 'QuePdf'),
+        (MODEL_ANS_PDF, 'AnsPdf'),
+    ]
+    OP_UPSERT = 'upsert'
+    OP_DELETE = 'delete'
+    OP_CHOICES = [(OP_UPSERT, 'Insert / update'), (OP_DELETE, 'Delete')]
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES)
+    object_id = models.IntegerField()
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'object_id']),  # compaction: latest entry per object
+            models.Index(fields=['op', 'created_at']),    # compaction: expiring tombstones
+        ]
+
+    def __str__(self):
+        return f"CatalogChange(v{self.id} {self.op} {self.model} {self.object_id})"
+
+
+# Single row: versions at or below `floor` may have lost tombstones to compaction, so
+# clients syncing from an older version must start over.
+class CatalogSyncState(models.Model):
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    floor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"CatalogSyncState(floor={self.floor})"
@@ -0,0 +1,126 @@
+import logging
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import QuePdf, AnsPdf, SearchDocument
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "home_searchdocument_fts"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ==============================================================================
+# INDEXING
+# ==============================================================================
+
+def _join(*parts):
+    return " ".join(p for p in parts if p)
+
+
+def index_que_pdf(que_pdf_id):
+    """(Re)builds the search document of one QuePdf from its fields, answers and extracted text."""
+    row = (
+        QuePdf.objects
+        .filter(pk=que_pdf_id)
+        .values('name', 'sub', 'choose', 'username', 'first_page_text')
+        .first()
+    )
+    if not row:
+        SearchDocument.objects.filter(pk=que_pdf_id).delete()
+        return
+
+    answers = AnsPdf.objects.filter(que_pdf_id=que_pdf_id).values_list('contant', 'first_page_text')
+    body = _join(
+        row['sub'],
+        row['choose'],
+        row['username'],
+        row['first_page_text'],
+        *(_join(contant, text) for contant, text in answers),
+    )
+    SearchDocument.objects.update_or_create(que_pdf_id=que_pdf_id, defaults={'title': row['name'], 'body': body})
+
+
+def rebuild_fts_table():
+    """SQLite only: resync the FTS5 shadow table from home_searchdocument in one statement."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+
+
+# ==============================================================================
+# QUERYING
+# ==============================================================================
+
+def _filters_sql(course_id, sem):
+    clauses, params = [], []
+    if course_id is not None:
+        clauses.append("q.course_id = %s")
+        params.append(course_id)
+    if sem is not None:
+        clauses.append("q.sem = %s")
+        params.append(sem)
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+def _search_postgres(text, course_id, sem, limit, offset):
+    where, params = _filters_sql(course_id, sem)
+    sql = (
+        "SELECT d.que_pdf_id, ts_rank_cd(d.search_vector, query) AS rank "
+        "FROM home_searchdocument d "
+        "JOIN home_quepdf q ON q.id = d.que_pdf_id, "
+        "websearch_to_tsquery('english', %s) query "
+        f"WHERE d.search_vector @@ query{where} "
+        "ORDER BY rank DESC, d.que_pdf_id DESC LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [text, *params, limit, offset])
+        return [(pk, float(rank)) for pk, rank in cursor.fetchall()]
+
+
+def _search_sqlite(text, course_id, sem, limit, offset):
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return []
+    # Quote every token (FTS5 syntax characters are inert inside quotes) and prefix-match it
+    match = " ".join(f'"{t}"*' for t in tokens)
+    where, params = _filters_sql(course_id, sem)
+    # bm25() is "lower is better"; weight title hits 10x body hits
+    sql = (
+        f"SELECT f.rowid, -bm25({FTS_TABLE}, 10.0, 1.0) AS rank "
+        f"FROM {FTS_TABLE} f "
+        "JOIN home_quepdf q ON q.id = f.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s{where} "
+        "ORDER BY rank DESC, f.rowid DESC LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, *params, limit, offset])
+        return [(pk, float(rank)) for pk, rank in cursor.fetchall()]
+
+
+def _search_fallback(text, course_id, sem, limit, offset):
+    # Other backends (e.g. MySQL): unranked substring match, newest first
+    qs = SearchDocument.objects.all()
+    for token in _TOKEN_RE.findall(text):
+        qs = qs.filter(Q(title__icontains=token) | Q(body__icontains=token))
+    if course_id is not None:
+        qs = qs.filter(que_pdf__course_id=course_id)
+    if sem is not None:
+        qs = qs.filter(que_pdf__sem=sem)
+    pks = qs.order_by('-que_pdf_id').values_list('que_pdf_id', flat=True)[offset:offset + limit]
+    return [(pk, 0.0) for pk in pks]
+
+
+def search_que_pdfs(text, *, course_id=None, sem=None, limit=20, offset=0):
+    """Returns [(que_pdf_id, rank), ...] best match first."""
+    text = (text or "").strip()
+    if not text:
+        return []
+    if connection.vendor == "postgresql":
+        return _search_postgres(text, course_id, sem, limit, offset)
+    if connection.vendor == "sqlite":
+        return _search_sqlite(text, course_id, sem, limit, offset)
+    return _search_fallback(text, course_id, sem, limit, offset)
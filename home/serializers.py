@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import CourseList, QuePdf, AnsPdf, Subject
+from core.serializers import ValuesSerializer, datetime_format
 
 # course list serializer
 class CourseListSerializer(serializers.ModelSerializer):
@@ -12,16 +13,19 @@ class CourseListSerializer(serializers.ModelSerializer):
 class QuePdfSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuePdf
-        fields = ['id', 'course', 'pdf', 'sem', 'dateCreated', 'timeCreated', 'name', 'div', 'year', 'sub', 'choose', 'username']
-        read_only_fields = ['id', 'dateCreated', 'timeCreated']  # these are typically system-set [web:27]
+        fields = ['id', 'course', 'pdf', 'sem', 'dateCreated', 'timeCreated', 'name', 'div', 'year', 'sub', 'choose', 'username',
+                  'page_count', 'file_size', 'first_page_text', 'thumbnail', 'answer_count', 'last_answer_at']
+        # system-set; previews come from the extraction task, answer stats from AnsPdf signals
+        read_only_fields = ['id', 'dateCreated', 'timeCreated', 'page_count', 'file_size', 'first_page_text', 'thumbnail',
+                            'answer_count', 'last_answer_at']
 
 # AnsPdf serializer
 class AnsPdfSerializer(serializers.ModelSerializer):
     class Meta:
         model = AnsPdf
         # Keep explicit list to avoid unintended fields and preserve API contract [web:27]
-        fields = ['id', 'que_pdf', 'name', 'contant', 'pdf']
-        read_only_fields = ['id']  # primary key is read-only [web:27]
+        fields = ['id', 'que_pdf', 'name', 'contant', 'pdf', 'page_count', 'file_size', 'first_page_text', 'thumbnail']
+        read_only_fields = ['id', 'page_count', 'file_size', 'first_page_text', 'thumbnail']  # previews come from the extraction task
 
 # Subject serializer
 class SubjectSerializer(serializers.ModelSerializer):
@@ -29,3 +33,37 @@ class SubjectSerializer(serializers.ModelSerializer):
         model = Subject
         fields = ['id', 'name', 'sem']
         read_only_fields = ['id']  # id is read-only [web:27]
+
+# values()-based read fast paths; output must stay identical to the serializers above
+
+class QuePdfValuesSerializer(ValuesSerializer):
+    fields = (
+        ('id', 'id'), ('course', 'course_id'), ('pdf', 'pdf'), ('sem', 'sem'), ('dateCreated', 'dateCreated'),
+        ('timeCreated', 'timeCreated'), ('name', 'name'), ('div', 'div'), ('year', 'year'), ('sub', 'sub'),
+        ('choose', 'choose'), ('username', 'username'), ('page_count', 'page_count'), ('file_size', 'file_size'),
+        ('first_page_text', 'first_page_text'), ('thumbnail', 'thumbnail'), ('answer_count', 'answer_count'),
+        ('last_answer_at', 'last_answer_at'),
+    )
+    formatters = {'last_answer_at': datetime_format()}
+
+class AnsPdfValuesSerializer(ValuesSerializer):
+    fields = (
+        ('id', 'id'), ('que_pdf', 'que_pdf_id'), ('name', 'name'), ('contant', 'contant'), ('pdf', 'pdf'),
+        ('page_count', 'page_count'), ('file_size', 'file_size'), ('first_page_text', 'first_page_text'),
+        ('thumbnail', 'thumbnail'),
+    )
+
+class PopularQuePdfValuesSerializer(ValuesSerializer):
+    """QuePdf rows plus their counters and precomputed ranks, for the popular list."""
+    fields = QuePdfValuesSerializer.fields + (
+        ('view_count', 'stats__view_count'), ('download_count', 'stats__download_count'),
+        ('subject_rank', 'popularity__subject_rank'), ('semester_rank', 'popularity__semester_rank'),
+    )
+    formatters = QuePdfValuesSerializer.formatters
+
+class CourseListValuesSerializer(ValuesSerializer):
+    fields = (('id', 'id'), ('name', 'name'), ('number_sem', 'number_sem'))
+
+class SubjectSyncValuesSerializer(ValuesSerializer):
+    """SubjectSerializer's fields plus the course, which offline clients need to file it."""
+    fields = (('id', 'id'), ('name', 'name'), ('sem', 'sem'), ('course', 'course_obj_id'))
@@ -4,13 +4,20 @@ import logging
 import urllib.parse
 
 # Django & Celery Imports
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+from django.db import transaction
 from django.template.loader import render_to_string
-from celery import shared_task
+from celery import shared_task, group
+
+from django.db.models import F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 
 # Local App Imports
-from .models import QuePdf
+from .models import CourseList, Subject, QuePdf, AnsPdf, CatalogChange
+from .utils import extract_pdf_metadata_task
+from .search import index_que_pdf
+from .sync import record_catalog_changes
 from Profile.models import profile
 
 # Brevo API client imports
@@ -20,6 +27,10 @@ from sib_api_v3_sdk.rest import ApiException
 # Set up a logger for this module
 logger = logging.getLogger(__name__)
 
+# Sent after QuePdf rows are inserted with bulk_create, which skips post_save.
+# Receivers get instances=[QuePdf, ...] (pks set) and notify=bool.
+que_pdfs_bulk_created = Signal()
+
 # ==============================================================================
 # BREVO API CLIENT CONFIGURATION
 # This setup is done once when the Celery worker starts for better performance.
@@ -75,8 +86,17 @@ def _send_templated_email(*, subject: str, to_email: str, html_template: str, co
         raise e
 
 # ==============================================================================
-# HELPER FUNCTION (NO CHANGES)
+# HELPER FUNCTIONS
 # ==============================================================================
+def que_pdf_link(sem, sub):
+    """Frontend URL of the subject page a QuePdf is listed on."""
+    return (
+        "https://pixelclass.netlify.app/"
+        f"{urllib.parse.quote(str(sem))}/"
+        f"{urllib.parse.quote(str(sub))}"
+    )
+
+
 def _heading_for_choose(choose):
     if choose == "exam_paper":
         return "Exam Paper"
@@ -85,11 +105,98 @@ def _heading_for_choose(choose):
     return choose
 
 # ==============================================================================
-# UPDATED CELERY TASK
+# BATCH EMAIL HELPER
+# One Brevo call per chunk: the HTML is rendered once with Brevo placeholders
+# ({{ params.username }}) and each recipient is a message version.
+# ==============================================================================
+
+NOTIFY_CHUNK_SIZE = 500  # message versions per Brevo call (API limit is 1000)
+USERNAME_PLACEHOLDER = "{{ params.username }}"
+
+
+def _chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _send_batch_templated_email(*, subject: str, recipients: list, html_message: str, plain_fallback: str):
+    """
+    Sends one pre-rendered email to many recipients via Brevo messageVersions.
+    recipients: [[email, username], ...]
+    """
+    if not configuration.api_key.get('api-key'):
+        logger.error("Cannot send email because Brevo API key is not configured.")
+        raise ValueError("Brevo API key is missing.")
+
+    sender = {"name": DEFAULT_SENDER_NAME, "email": DEFAULT_SENDER_EMAIL}
+    versions = [
+        sib_api_v3_sdk.SendSmtpEmailMessageVersions(
+            to=[{"email": email, "name": username}],
+            params={"username": username},
+        )
+        for email, username in recipients
+    ]
+
+    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+        sender=sender,
+        subject=subject,
+        html_content=html_message,
+        text_content=plain_fallback,
+        message_versions=versions,
+    )
+
+    try:
+        api_response = api_instance.send_transac_email(send_smtp_email)
+        logger.info(f"Batch email '{subject}' sent to {len(recipients)} recipients via Brevo. Message IDs: {api_response.message_ids or api_response.message_id}")
+    except ApiException as e:
+        logger.error(f"Brevo API error when sending batch of {len(recipients)} emails: {e.body}")
+        raise e
+
+
+# ==============================================================================
+# CELERY TASKS
+# send_email_task only resolves recipients and renders the template; the
+# actual sends run as parallel chunk subtasks.
 # ==============================================================================
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 5})
+def send_email_batch_task(self, recipients, subject, html_message, plain_fallback):
+    """Sends one chunk of a fan-out; retried independently of the other chunks."""
+    _send_batch_templated_email(
+        subject=subject,
+        recipients=recipients,
+        html_message=html_message,
+        plain_fallback=plain_fallback,
+    )
+
+
+def _fan_out_to_course(course_id, *, subject, html_message, plain_fallback):
+    """Queues chunked batch sends of a pre-rendered email to every user of a course."""
+    recipients = [
+        [email, username]
+        for email, username in (
+            profile.objects
+            .filter(course_obj_id=course_id)
+            .exclude(user_obj__email="")
+            .values_list('user_obj__email', 'user_obj__username')
+        )
+        if email
+    ]
+    if not recipients:
+        logger.warning(f"No users found for course ID {course_id}. Nothing to send.")
+        return 0
+
+    chunks = list(_chunked(recipients, NOTIFY_CHUNK_SIZE))
+    group(
+        send_email_batch_task.s(chunk, subject, html_message, plain_fallback)
+        for chunk in chunks
+    ).apply_async()
+    logger.info(f"Dispatched {len(chunks)} batch email task(s) for {len(recipients)} users of course ID {course_id}.")
+    return len(recipients)
+
+
 @shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 5})
 def send_email_task(self, instance_data):
-    """Celery task to send bulk email notifications using the reusable helper."""
+    """Celery task that fans a new-QuePdf notification out to the course's users in chunks."""
     try:
         if not isinstance(instance_data, dict):
             logger.error(f"Received unexpected data format: {type(instance_data)}")
@@ -98,53 +205,62 @@ def send_email_task(self, instance_data):
         qid = instance_data.get('id')
         logger.info(f"Processing email task for QuePdf ID: {qid}")
 
-        instance = QuePdf.objects.only('course', 'choose').filter(id=qid).first()
+        instance = QuePdf.objects.only('course_id', 'choose').filter(id=qid).first()
         if not instance:
             logger.error(f"QuePdf instance with ID {qid} not found.")
             return
 
-        matching_users = profile.objects.filter(course=instance.course).select_related('user_obj').only('user_obj__email', 'user_obj__username')
-        if not matching_users.exists():
-            logger.warning(f"No users found matching course: {instance.course}. Task finished.")
-            return
-
         heading = _heading_for_choose(instance.choose)
         pdf_link = instance_data.get("pdf_link", "")
         subject = f"📝 New {heading} PDF Available!"
-        
-        logger.info(f"Found {matching_users.count()} users to notify for course '{instance.course}'.")
-
-        for prof in matching_users:
-            user_obj = prof.user_obj
-            user_email = getattr(user_obj, "email", None)
-            username = getattr(user_obj, "username", "User")
-            
-            if not user_email:
-                logger.warning(f"Skipping user {username} due to missing email.")
-                continue
-
-            try:
-                context = {
-                    'instance': instance_data,
-                    'user': {'username': username},
-                    'pdf_link': pdf_link,
-                    'heading': heading,
-                }
-                _send_templated_email(
-                    subject=subject,
-                    to_email=user_email,
-                    html_template='que_pdf_notification/que_pdf_notification.html',
-                    context=context,
-                    plain_fallback=f"Hello {username}, a new {heading} has been uploaded for your course. View it here: {pdf_link}"
-                )
-            except Exception as e:
-                # Log the error for the specific user but continue the loop
-                logger.error(f"Failed to send notification to {user_email}. Error: {e}")
+
+        # Render once; Brevo substitutes the username per message version
+        html_message = render_to_string('que_pdf_notification/que_pdf_notification.html', {
+            'instance': instance_data,
+            'user': {'username': USERNAME_PLACEHOLDER},
+            'pdf_link': pdf_link,
+            'heading': heading,
+        })
+        plain_fallback = f"Hello {USERNAME_PLACEHOLDER}, a new {heading} has been uploaded for your course. View it here: {pdf_link}"
+
+        _fan_out_to_course(instance.course_id, subject=subject, html_message=html_message, plain_fallback=plain_fallback)
 
     except Exception as e:
         logger.exception(f"A critical error occurred in the email task for QuePdf ID {instance_data.get('id')}. Celery will retry.")
         raise self.retry(exc=e)
 
+SUMMARY_LIST_LIMIT = 20  # papers listed by name in a summary email; the rest are counted
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 5})
+def send_que_pdf_summary_task(self, course_id, que_pdf_ids):
+    """One "N new papers" email per course user for a batch of uploads, instead of one email per paper."""
+    papers = list(
+        QuePdf.objects
+        .filter(id__in=que_pdf_ids, course_id=course_id)
+        .order_by('sem', 'sub', 'name')
+        .values('name', 'sub', 'sem', 'choose')
+    )
+    if not papers:
+        logger.warning(f"No QuePdf rows left for summary of course ID {course_id}. Task finished.")
+        return
+
+    for paper in papers:
+        paper['heading'] = _heading_for_choose(paper['choose'])
+        paper['pdf_link'] = que_pdf_link(paper['sem'], paper['sub'])
+
+    count = len(papers)
+    subject = f"📚 {count} new PDF{'s' if count != 1 else ''} added for your course!"
+    html_message = render_to_string('que_pdf_notification/que_pdf_summary.html', {
+        'user': {'username': USERNAME_PLACEHOLDER},
+        'count': count,
+        'papers': papers[:SUMMARY_LIST_LIMIT],
+        'more': max(count - SUMMARY_LIST_LIMIT, 0),
+    })
+    plain_fallback = f"Hello {USERNAME_PLACEHOLDER}, {count} new PDFs have been uploaded for your course. Open Pixel Class to view them."
+
+    _fan_out_to_course(course_id, subject=subject, html_message=html_message, plain_fallback=plain_fallback)
+
 # ==============================================================================
 # SIGNAL RECEIVER (NO CHANGES NEEDED, LOGGING IMPROVED)
 # ==============================================================================
@@ -157,13 +273,7 @@ def que_pdf_notification(sender, instance, created, **kwargs):
             serializer = QuePdfSerializer(instance)
             instance_data = serializer.data
 
-            sem = str(getattr(instance, 'sem', ''))
-            sub = str(getattr(instance, 'sub', ''))
-            instance_data["pdf_link"] = (
-                "https://pixelclass.netlify.app/"
-                f"{urllib.parse.quote(sem)}/"
-                f"{urllib.parse.quote(sub)}"
-            )
+            instance_data["pdf_link"] = que_pdf_link(getattr(instance, 'sem', ''), getattr(instance, 'sub', ''))
 
             logger.debug(f"QuePdf Created - Data to be sent to Celery: {json.dumps(instance_data)}")
 
@@ -174,4 +284,146 @@ def que_pdf_notification(sender, instance, created, **kwargs):
                 logger.error("Instance ID is missing after save, cannot dispatch Celery task.")
 
         except Exception as e:
-            logger.exception(f"Failed to trigger email notification task for QuePdf: {e}")
\ No newline at end of file
+            logger.exception(f"Failed to trigger email notification task for QuePdf: {e}")
+
+
+# ==============================================================================
+# PDF PREVIEW PIPELINE
+# ==============================================================================
+@receiver(post_save, sender='home.QuePdf')
+@receiver(post_save, sender='home.AnsPdf')
+def pdf_preview_extraction(sender, instance, created, **kwargs):
+    """Queue preview extraction for new rows and rows whose PDF was replaced."""
+    if not created and instance.preview_source == instance.pdf:
+        return
+
+    model_name = sender.__name__
+    pk = instance.pk
+    try:
+        # Wait for commit so the worker can see the row
+        transaction.on_commit(lambda: extract_pdf_metadata_task.apply_async(args=[model_name, pk]), robust=True)
+        logger.info(f"Queued preview extraction for {model_name} ID: {pk}")
+    except Exception as e:
+        logger.exception(f"Failed to queue preview extraction for {model_name} ID {pk}: {e}")
+
+
+# ==============================================================================
+# SEARCH INDEX MAINTENANCE
+# ==============================================================================
+def _queue_reindex(que_pdf_id):
+    # Cheap (a couple of indexed queries + one upsert), so done in-process after commit
+    transaction.on_commit(lambda: index_que_pdf(que_pdf_id), robust=True)
+
+
+@receiver(post_save, sender='home.QuePdf')
+def que_pdf_search_index(sender, instance, **kwargs):
+    _queue_reindex(instance.pk)
+
+
+@receiver(post_save, sender='home.AnsPdf')
+@receiver(post_delete, sender='home.AnsPdf')
+def ans_pdf_search_index(sender, instance, **kwargs):
+    if instance.que_pdf_id:
+        _queue_reindex(instance.que_pdf_id)
+
+
+# ==============================================================================
+# BULK INSERTS
+# bulk_create skips post_save, so the per-row work above is redone here in bulk,
+# and the per-row email becomes one summary per course.
+# ==============================================================================
+@receiver(que_pdfs_bulk_created)
+def que_pdfs_bulk_pipeline(sender, instances, notify=True, **kwargs):
+    pks = [obj.pk for obj in instances]
+    # In the caller's transaction, like the per-row catalog receivers
+    record_catalog_changes(CatalogChange.MODEL_QUE_PDF, pks)
+
+    def _dispatch():
+        for pk in pks:
+            index_que_pdf(pk)
+            extract_pdf_metadata_task.apply_async(args=["QuePdf", pk])
+        logger.info(f"Indexed and queued preview extraction for {len(pks)} bulk-created QuePdf rows.")
+
+        if notify:
+            by_course = {}
+            for obj in instances:
+                by_course.setdefault(obj.course_id, []).append(obj.pk)
+            for course_id, ids in by_course.items():
+                send_que_pdf_summary_task.apply_async(args=[course_id, ids])
+                logger.info(f"Dispatched summary notification for {len(ids)} QuePdf rows of course ID {course_id}.")
+
+    transaction.on_commit(_dispatch, robust=True)
+
+
+# ==============================================================================
+# ANSWER COUNTERS
+# QuePdf.answer_count / last_answer_at follow AnsPdf inserts and deletes, in the
+# same transaction as the AnsPdf write.
+# ==============================================================================
+def _deleting_que_pdf(origin):
+    return isinstance(origin, QuePdf) or (isinstance(origin, QuerySet) and origin.model is QuePdf)
+
+
+@receiver(post_save, sender='home.AnsPdf')
+def ans_pdf_counter_on_create(sender, instance, created, **kwargs):
+    if not created or not instance.que_pdf_id:
+        return
+    updates = {'answer_count': F('answer_count') + 1}
+    if instance.created_at:
+        answered_at = Value(instance.created_at)
+        updates['last_answer_at'] = Greatest(Coalesce('last_answer_at', answered_at), answered_at)
+    with transaction.atomic():
+        QuePdf.objects.filter(pk=instance.que_pdf_id).update(**updates)
+
+
+@receiver(post_delete, sender='home.AnsPdf')
+def ans_pdf_counter_on_delete(sender, instance, origin=None, **kwargs):
+    if not instance.que_pdf_id:
+        return
+    # Cascade from deleting the QuePdf itself: the row is about to go, skip the UPDATE
+    if _deleting_que_pdf(origin):
+        return
+    # Undated legacy answers don't count (Postgres sorts NULL first on DESC); same rule as Max() in reconcile_answer_counts
+    latest = (
+        AnsPdf.objects.filter(que_pdf_id=OuterRef('pk'), created_at__isnull=False)
+        .order_by('-created_at').values('created_at')[:1]
+    )
+    with transaction.atomic():
+        QuePdf.objects.filter(pk=instance.que_pdf_id).update(
+            answer_count=Greatest(F('answer_count') - 1, Value(0)),
+            last_answer_at=Subquery(latest),
+        )
+
+
+# ==============================================================================
+# CATALOG CHANGE LOG
+# One CatalogChange per write, in the same transaction, for the delta-sync API
+# (sync.py). update() paths that bypass these call record_catalog_changes directly.
+# ==============================================================================
+_CATALOG_KEYS = {
+    CourseList: CatalogChange.MODEL_COURSE,
+    Subject: CatalogChange.MODEL_SUBJECT,
+    QuePdf: CatalogChange.MODEL_QUE_PDF,
+    AnsPdf: CatalogChange.MODEL_ANS_PDF,
+}
+
+
+@receiver(post_save, sender=CourseList)
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=QuePdf)
+@receiver(post_save, sender=AnsPdf)
+def catalog_change_on_save(sender, instance, **kwargs):
+    record_catalog_changes(_CATALOG_KEYS[sender], [instance.pk])
+    if sender is AnsPdf:
+        # The question's answer_count / last_answer_at moved with it
+        record_catalog_changes(CatalogChange.MODEL_QUE_PDF, [instance.que_pdf_id])
+
+
+@receiver(post_delete, sender=CourseList)
+@receiver(post_delete, sender=Subject)
+@receiver(post_delete, sender=QuePdf)
+@receiver(post_delete, sender=AnsPdf)
+def catalog_change_on_delete(sender, instance, origin=None, **kwargs):
+    record_catalog_changes(_CATALOG_KEYS[sender], [instance.pk], op=CatalogChange.OP_DELETE)
+    if sender is AnsPdf and not _deleting_que_pdf(origin):
+        record_catalog_changes(CatalogChange.MODEL_QUE_PDF, [instance.que_pdf_id])
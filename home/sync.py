@@ -0,0 +1,170 @@
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from .models import CourseList, Subject, QuePdf, AnsPdf, CatalogChange, CatalogSyncState
+from .serializers import (
+    CourseListValuesSerializer, SubjectSyncValuesSerializer, QuePdfValuesSerializer, AnsPdfValuesSerializer,
+)
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CATALOG DELTA SYNC
+# Every insert/update/delete of a catalog row appends a CatalogChange; its id is a
+# monotonically increasing version. Clients keep the last version they applied and
+# ask for everything after it; version 0 is a full download.
+#
+# Ids are allocated before commit, so a transaction can commit a lower id after a
+# higher one is already visible. A page must never hand out a version while a
+# lower one can still appear, or clients that move past it skip that change:
+# - PostgreSQL: every writer holds a shared advisory lock keyed by the sequence
+#   position it started from (reserve_catalog_versions) until it commits; readers
+#   stop below the lowest such key (committed_version_horizon).
+# - SQLite: one writer at a time, so ids commit in order.
+# - Anything else: only entries older than SYNC_SETTLE are served. That is a
+#   heuristic, not a guarantee: a transaction running longer can still be skipped.
+# Remaining limit on PostgreSQL: a long-running catalog write holds sync back for
+# every client until it ends (late, never lost); so would any other code taking
+# single-key advisory locks in this database.
+# ==============================================================================
+
+SYNC_MODELS = {
+    CatalogChange.MODEL_COURSE: (CourseList, CourseListValuesSerializer),
+    CatalogChange.MODEL_SUBJECT: (Subject, SubjectSyncValuesSerializer),
+    CatalogChange.MODEL_QUE_PDF: (QuePdf, QuePdfValuesSerializer),
+    CatalogChange.MODEL_ANS_PDF: (AnsPdf, AnsPdfValuesSerializer),
+}
+SYNC_PAGE_MAX = 1000
+TOMBSTONE_RETENTION = timedelta(days=30)
+# Backends other than PostgreSQL / SQLite: only entries older than this are served
+SYNC_SETTLE = timedelta(seconds=2)
+
+_SEQUENCE_POSITION_SQL = "COALESCE(pg_sequence_last_value(pg_get_serial_sequence(%s, 'id')::regclass), 0)"
+
+
+def reserve_catalog_versions():
+    """
+    PostgreSQL: before taking CatalogChange ids, hold a shared advisory lock keyed by
+    the current sequence position until this transaction ends. Every id it takes is
+    above that key (the sequence hands out increasing values; Django creates it with
+    CACHE 1). Must run in the same transaction as the insert.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT pg_advisory_xact_lock_shared({_SEQUENCE_POSITION_SQL})", [CatalogChange._meta.db_table])
+
+
+def committed_version_horizon():
+    """
+    PostgreSQL: the highest version no uncommitted change can still be below.
+    The sequence is read before the locks: a writer whose lock is not there yet
+    takes its ids after this read, so they are above the returned value.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {_SEQUENCE_POSITION_SQL}", [CatalogChange._meta.db_table])
+        horizon = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT MIN((classid::bigint << 32) | objid::bigint) FROM pg_locks
+            WHERE locktype = 'advisory' AND objsubid = 1
+              AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+            """
+        )
+        lowest_reserved = cursor.fetchone()[0]
+    if lowest_reserved is not None:
+        horizon = min(horizon, lowest_reserved)
+    return horizon
+
+
+def record_catalog_changes(model_key, object_ids, op=CatalogChange.OP_UPSERT):
+    """Appends one change per id; used by the signals and by bulk update() paths that bypass them."""
+    object_ids = [pk for pk in object_ids if pk is not None]
+    if object_ids:
+        with transaction.atomic():
+            reserve_catalog_versions()
+            CatalogChange.objects.bulk_create(
+                [CatalogChange(model=model_key, object_id=pk, op=op) for pk in object_ids],
+                batch_size=1000,
+            )
+
+
+def current_floor():
+    return CatalogSyncState.objects.filter(id=1).values_list('floor', flat=True).first() or 0
+
+
+def changes_since(since, *, limit=SYNC_PAGE_MAX):
+    """
+    Returns {"changes", "version", "has_more", "reset"}. Upserts carry the row as it is
+    now (same shape as the list endpoints); an object changed several times in the page
+    appears once, at its latest version. reset=True means `since` predates compaction
+    and the client must drop its copy and sync again from 0.
+    """
+    if since and since < current_floor():
+        return {"changes": [], "version": 0, "has_more": False, "reset": True}
+
+    entries = CatalogChange.objects.filter(id__gt=since)
+    if connection.vendor == 'postgresql':
+        entries = entries.filter(id__lte=committed_version_horizon())
+    elif connection.vendor != 'sqlite':
+        entries = entries.filter(created_at__lte=timezone.now() - SYNC_SETTLE)
+    entries = list(entries.order_by('id').values_list('id', 'model', 'object_id', 'op')[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    version = entries[-1][0] if entries else since
+
+    latest = {}
+    for change_id, model_key, object_id, op in entries:
+        latest.pop((model_key, object_id), None)  # re-insert so dict order follows the latest version
+        latest[(model_key, object_id)] = (change_id, op)
+
+    # One query per model for all upserted rows in the page
+    rows = {}
+    for model_key, (model, serializer) in SYNC_MODELS.items():
+        ids = [object_id for (key, object_id), (_, op) in latest.items() if key == model_key and op == CatalogChange.OP_UPSERT]
+        if ids:
+            for row in serializer.iter_rows(model.objects.filter(pk__in=ids)):
+                rows[(model_key, row['id'])] = row
+
+    changes = []
+    for (model_key, object_id), (change_id, op) in latest.items():
+        if op == CatalogChange.OP_UPSERT:
+            data = rows.get((model_key, object_id))
+            if data is None:
+                continue  # deleted since; its delete entry is later in the log
+            changes.append({"version": change_id, "model": model_key, "id": object_id, "op": op, "data": data})
+        else:
+            changes.append({"version": change_id, "model": model_key, "id": object_id, "op": op})
+
+    return {"changes": changes, "version": version, "has_more": has_more, "reset": False}
+
+
+def compact_catalog_changes(*, retention=TOMBSTONE_RETENTION):
+    """
+    1. Drops entries superseded by a newer entry for the same object (no client can
+       miss anything: it will still receive the newer one).
+    2. Drops delete tombstones older than `retention` and raises the floor past them,
+       so clients that were offline longer than that get reset=True.
+    Returns (superseded, expired) row counts.
+    """
+    newer = CatalogChange.objects.filter(model=OuterRef('model'), object_id=OuterRef('object_id'), id__gt=OuterRef('id'))
+    with transaction.atomic():
+        superseded, _ = CatalogChange.objects.filter(Exists(newer)).delete()
+
+        expired_qs = CatalogChange.objects.filter(op=CatalogChange.OP_DELETE, created_at__lt=timezone.now() - retention)
+        new_floor = expired_qs.aggregate(m=Max('id'))['m']
+        expired = 0
+        if new_floor:
+            expired, _ = expired_qs.filter(id__lte=new_floor).delete()
+            state, _ = CatalogSyncState.objects.select_for_update().get_or_create(id=1)
+            if new_floor > state.floor:
+                state.floor = new_floor
+                state.save(update_fields=['floor'])
+
+    logger.info(f"Compacted catalog change log: {superseded} superseded, {expired} expired tombstones.")
+    return superseded, expired
@@ -1,3 +1,180 @@
-from django.test import TestCase
+import io
+import json
+import queue
+import threading
+from http.server import ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .blob_tokens import CALLBACK_SIGNATURE_HEADER, sign_callback
+from .management.commands.fake_blob_server import _FakeBlobHandler
+from .models import AnsPdf, CourseList, QuePdf, UploadSession
+from .utils import extract_pdf_metadata
+
+
+def make_pdf(text="Pixel Classes sample paper", width=200, height=300):
+    """A one-page PDF with `text` in Helvetica, built by hand so tests need no fixture files."""
+    stream = f"BT /F1 12 Tf 20 {height - 40} Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>"
+        ).encode("latin-1"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+class ExtractPdfMetadataTests(SimpleTestCase):
+    def test_reads_pages_size_text_and_thumbnail(self):
+        from PIL import Image
+
+        data = make_pdf()
+        meta = extract_pdf_metadata(data, thumbnail_width=100)
+
+        self.assertEqual(meta["page_count"], 1)
+        self.assertEqual(meta["file_size"], len(data))
+        self.assertEqual(meta["first_page_text"], "Pixel Classes sample paper")
+        with Image.open(io.BytesIO(meta["thumbnail"])) as thumbnail:
+            self.assertEqual(thumbnail.format, "WEBP")
+            self.assertEqual(thumbnail.size, (100, 150))
+
+    def test_corrupt_pdf_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            extract_pdf_metadata(b"%PDF-1.4\nthis is not a pdf")
+
+    def test_truncated_pdf_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            extract_pdf_metadata(make_pdf()[:60])
+
+
+TEST_RW_TOKEN = "vercel_blob_rw_teststore_localsecret"
+
+
+class DirectUploadTests(TestCase):
+    """Token -> PUT -> confirm -> signed callback against the local fake blob server."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeBlobHandler)
+        server.rw_token = TEST_RW_TOKEN
+        server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        server.blobs = {}
+        server.lock = threading.Lock()
+        server.log = lambda msg: None
+        # Keep the upload-completed callbacks the server would send; the tests deliver them
+        server.callbacks = True
+        server.sent_callbacks = queue.Queue()
+        server.send_callback = lambda callback, blob: server.sent_callbacks.put((callback, blob))
+        cls.server = server
+        cls.server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.settings_override = override_settings(
+            VERCEL_BLOB_TOKEN=TEST_RW_TOKEN, BLOB_API_URL=server.base_url, BLOB_PUBLIC_BASE_URL=server.base_url,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.blobs.clear()
+        self.server.sent_callbacks = queue.Queue()
+        self.user = User.objects.create_user(username="uploader", password="x")
+        self.course = CourseList.objects.create(name="B.C.A", number_sem=6)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _start(self, **data):
+        resp = self.client.post(reverse("upload_token"), {"filename": "paper.pdf", "size": 100, **data}, format="json")
+        self.assertEqual(resp.status_code, 201, resp.data)
+        return resp.data
+
+    def _put(self, upload_url, token, body=b"%PDF-1.4 test"):
+        return requests.put(
+            upload_url, data=body, timeout=5,
+            headers={"Authorization": f"Bearer {token}", "x-content-type": "application/pdf"},
+        )
+
+    def _deliver_callback(self, signature=None):
+        # The server fires the callback from its own thread after answering the PUT
+        callback, blob = self.server.sent_callbacks.get(timeout=5)
+        body = json.dumps({
+            "type": "blob.upload-completed",
+            "payload": {"blob": blob, "tokenPayload": callback["tokenPayload"]},
+        }).encode()
+        return self.client.generic(
+            "POST", reverse("upload_callback"), body, content_type="application/json",
+            **{f"HTTP_{CALLBACK_SIGNATURE_HEADER.upper().replace('-', '_')}": signature or sign_callback(body, rw_token=TEST_RW_TOKEN)},
+        )
+
+    def test_confirm_then_callback_creates_one_que_pdf(self):
+        start = self._start(kind="que", name="Maths 2024", sub="Maths", choose="Paper", sem=3, course_id=self.course.pk)
+        self.assertEqual(self._put(start["upload_url"], start["client_token"]).status_code, 200)
+
+        with mock.patch("home.signal.extract_pdf_metadata_task"), mock.patch("home.signal.send_email_task"):
+            confirm = self.client.post(reverse("upload_confirm", args=[start["upload_id"]]))
+            self.assertEqual(confirm.status_code, 201, confirm.data)
+            callback = self._deliver_callback()
+            self.assertEqual(callback.status_code, 200, callback.data)
+            again = self.client.post(reverse("upload_confirm", args=[start["upload_id"]]))
+            self.assertEqual(again.status_code, 201)
+
+        rows = QuePdf.objects.filter(author=self.user)
+        self.assertEqual(rows.count(), 1)
+        self.assertEqual(rows.get().pdf, f"{self.server.base_url}/{start['pathname']}".replace(" ", "%20"))
+        self.assertIsNotNone(UploadSession.objects.get(pk=start["upload_id"]).completed_at)
+
+    def test_callback_then_confirm_creates_one_ans_pdf(self):
+        question = QuePdf.objects.create(
+            course=self.course, pdf="https://example.com/q.pdf", sem=3, year=2025, div="all",
+            sub="Maths", name="Maths", choose="Paper", username="admin",
+        )
+        start = self._start(kind="ans", id=question.pk, content="worked answer")
+        self.assertEqual(self._put(start["upload_url"], start["client_token"]).status_code, 200)
+
+        with mock.patch("home.signal.extract_pdf_metadata_task"):
+            self.assertEqual(self._deliver_callback().status_code, 200)
+            self.assertEqual(self.client.post(reverse("upload_confirm", args=[start["upload_id"]])).status_code, 201)
+
+        self.assertEqual(AnsPdf.objects.filter(que_pdf=question, author=self.user).count(), 1)
+
+    def test_put_to_another_pathname_is_forbidden(self):
+        start = self._start(kind="que", name="Maths 2024", sub="Maths", choose="Paper", sem=3, course_id=self.course.pk)
+        other_url = start["upload_url"].rsplit("/", 1)[0] + "/other.pdf"
+
+        self.assertEqual(self._put(other_url, start["client_token"]).status_code, 403)
+        self.assertEqual(self.server.blobs, {})
+
+    def test_callback_with_bad_signature_is_forbidden(self):
+        start = self._start(kind="que", name="Maths 2024", sub="Maths", choose="Paper", sem=3, course_id=self.course.pk)
+        self.assertEqual(self._put(start["upload_url"], start["client_token"]).status_code, 200)
+
+        self.assertEqual(self._deliver_callback(signature="0" * 64).status_code, 403)
+        self.assertFalse(QuePdf.objects.filter(author=self.user).exists())
+        self.assertIsNone(UploadSession.objects.get(pk=start["upload_id"]).completed_at)
@@ -0,0 +1,461 @@
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from vercel_blob import put
+
+from Profile.models import profile as ProfileModel
+from Profile.utils import replace_profile_pic
+from .blob_tokens import generate_client_token, public_blob_url
+from .models import QuePdf, AnsPdf, UploadSession, get_current_date, get_current_time
+from .serializers import QuePdfSerializer
+from .signal import que_pdfs_bulk_created
+from .utils import short_blob_name, unique_blob_path, upload_blobs_concurrently
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# ROW CREATION
+# Shared by the one-shot multipart views and the resumable upload finalize step,
+# so every path validates and creates QuePdf / AnsPdf rows the same way.
+# ==============================================================================
+
+UPLOAD_MAX_SIZE = 50 * 1024 * 1024  # same ceiling the preview extractor will download
+
+
+# Unique per upload: two files with the same name must never share (or overwrite) a blob
+def que_pdf_blob_path(metadata, filename):
+    return unique_blob_path(f"QuePdf/{metadata['choose']}/sem {metadata['sem']}/{filename}")
+
+
+def ans_pdf_blob_path(metadata, filename):
+    return unique_blob_path(f"AnsPdf/{filename}")
+
+
+def _que_pdf_serializer(user, metadata, pdf_url):
+    return QuePdfSerializer(data={
+        "name": metadata.get("name"),
+        "sub": metadata.get("sub"),
+        "choose": metadata.get("choose"),
+        "sem": metadata.get("sem"),
+        "pdf": pdf_url,
+        "dateCreated": get_current_date(),
+        "timeCreated": get_current_time(),
+        "year": 2025,
+        "div": "all",
+        "course": metadata.get("course_id", 1),
+        "username": user.username,
+    })
+
+
+def clean_upload_metadata(kind, user, data):
+    """
+    Validates the row fields for an upload before any bytes are accepted.
+    Returns the metadata to store on the session; raises ValidationError.
+    """
+    if kind == UploadSession.KIND_QUE:
+        metadata = {key: data.get(key) for key in ("name", "sub", "choose", "sem")}
+        metadata["course_id"] = data.get("course_id", 1)
+        # Placeholder URL: only the blob location is unknown until finalize
+        serializer = _que_pdf_serializer(user, metadata, "https://pending.invalid/upload.pdf")
+        serializer.is_valid(raise_exception=True)
+        return metadata
+
+    if kind == UploadSession.KIND_ANS:
+        qid = data.get("id")
+        if not qid or not QuePdf.objects.filter(id=qid).exists():
+            raise ValidationError({"id": "Invalid question reference"})
+        return {"id": int(qid), "content": data.get("content")}
+
+    if kind == UploadSession.KIND_AVATAR:
+        return {}
+
+    raise ValidationError({"kind": f"Must be one of: {', '.join(k for k, _ in UploadSession.KIND_CHOICES)}"})
+
+
+def create_que_pdf(user, metadata, pdf_url):
+    """Creates the QuePdf row for an uploaded blob; raises ValidationError."""
+    serializer = _que_pdf_serializer(user, metadata, pdf_url)
+    serializer.is_valid(raise_exception=True)
+    serializer.save(author=user)
+    return serializer
+
+
+def bulk_create_que_pdfs(objects):
+    """
+    bulk_create that always returns rows with pks (falls back to a lookup by blob URL
+    on backends without RETURNING). Callers send que_pdfs_bulk_created afterwards.
+    """
+    created = QuePdf.objects.bulk_create(objects, batch_size=500)
+    if any(obj.pk is None for obj in created):
+        # Backends without RETURNING (MySQL): recover pks by the unique blob URL
+        by_url = dict(QuePdf.objects.filter(pdf__in=[o.pdf for o in created]).values_list('pdf', 'id'))
+        for obj in created:
+            obj.pk = obj.id = by_url.get(obj.pdf)
+    return created
+
+
+def create_ans_pdf(user, metadata, pdf_url):
+    """Creates the AnsPdf row for an uploaded blob; raises QuePdf.DoesNotExist."""
+    que_pdf_obj = QuePdf.objects.only('id').get(id=metadata["id"])
+    # Row and its QuePdf answer counters commit together
+    with transaction.atomic():
+        return AnsPdf.objects.create(
+            que_pdf=que_pdf_obj, name=user.username, author=user, contant=metadata.get("content"), pdf=pdf_url,
+        )
+
+
+# ==============================================================================
+# BATCH UPLOADS
+# Many PDFs in one multipart request: validate everything first, push to blob
+# storage with a bounded pool, then one bulk_create and one aggregated notification.
+# ==============================================================================
+
+BATCH_MAX_FILES = 50
+BATCH_UPLOAD_CONCURRENCY = 4
+
+
+def create_que_pdf_batch(user, items, *, notify=True):
+    """
+    items: [(metadata, uploaded_file), ...]. Raises ValidationError (keyed by item index)
+    before anything is uploaded. Returns (created QuePdf list, [(index, filename, error)]).
+    """
+    if not items:
+        raise ValidationError({"pdf": "No files uploaded."})
+    if len(items) > BATCH_MAX_FILES:
+        raise ValidationError({"pdf": f"At most {BATCH_MAX_FILES} files per batch."})
+
+    objects, errors = [], {}
+    for index, (metadata, upload) in enumerate(items):
+        if upload.size > UPLOAD_MAX_SIZE:
+            errors[index] = {"pdf": [f"File larger than {UPLOAD_MAX_SIZE} bytes."]}
+            continue
+        serializer = _que_pdf_serializer(user, metadata, "https://pending.invalid/upload.pdf")
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            continue
+        objects.append(QuePdf(**serializer.validated_data, author=user))
+    if errors:
+        raise ValidationError({"items": errors})
+
+    results = upload_blobs_concurrently(
+        [(que_pdf_blob_path(metadata, upload.name), upload.read) for metadata, upload in items],
+        max_workers=BATCH_UPLOAD_CONCURRENCY,
+    )
+    uploaded, failures = [], []
+    for index, (obj, (metadata, upload), (url, error)) in enumerate(zip(objects, items, results)):
+        if error:
+            failures.append((index, upload.name, str(error)))
+            continue
+        obj.pdf = url
+        uploaded.append(obj)
+
+    if not uploaded:
+        return [], failures
+
+    with transaction.atomic():
+        created = bulk_create_que_pdfs(uploaded)
+        que_pdfs_bulk_created.send(sender=QuePdf, instances=created, notify=notify)
+    logger.info(f"Batch upload by {user.username}: {len(created)} created, {len(failures)} failed.")
+    return created, failures
+
+
+# ==============================================================================
+# RESUMABLE UPLOAD SESSIONS
+# Chunks are appended at an explicit offset to a temp file, so a dropped request
+# only costs the chunk in flight. Sessions expire after UPLOAD_SESSION_TTL of
+# inactivity: they are refused from then on and purged by the expiry-cleanup endpoint.
+# ==============================================================================
+
+UPLOAD_SESSION_TTL = timedelta(hours=24)
+UPLOAD_CHUNK_MAX = 8 * 1024 * 1024  # largest chunk accepted per append request
+_READ_BLOCK = 64 * 1024
+
+
+def _session_dir():
+    # Must be shared by every web process that can receive a chunk for the same session
+    path = getattr(settings, "UPLOAD_SESSION_DIR", None) or os.path.join(tempfile.gettempdir(), "pixel-uploads")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def session_file_path(session):
+    return os.path.join(_session_dir(), f"{session.pk}.part")
+
+
+def _clean_filename(filename):
+    filename = os.path.basename(filename or "").strip()
+    if not filename:
+        raise ValidationError({"filename": "This field is required."})
+    if len(filename) > UploadSession._meta.get_field("filename").max_length:
+        raise ValidationError({"filename": "File name is too long."})
+    return filename
+
+
+def start_upload_session(user, kind, filename, size, metadata):
+    if kind not in (UploadSession.KIND_QUE, UploadSession.KIND_ANS):
+        raise ValidationError({"kind": "Chunked uploads are for QuePdf / AnsPdf only."})
+    filename = _clean_filename(filename)
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ValidationError({"size": "A valid integer is required."})
+    if not 0 < size <= UPLOAD_MAX_SIZE:
+        raise ValidationError({"size": f"Must be between 1 and {UPLOAD_MAX_SIZE} bytes."})
+
+    session = UploadSession.objects.create(
+        user=user,
+        kind=kind,
+        filename=filename,
+        size=size,
+        metadata=metadata,
+        expires_at=timezone.now() + UPLOAD_SESSION_TTL,
+    )
+    # Create the empty part file up front so appends can always open it r+b
+    open(session_file_path(session), "wb").close()
+    return session
+
+
+def live_upload_sessions(user):
+    """The user's sessions that have not expired; expired ones are unusable even before the purge runs."""
+    return UploadSession.objects.filter(user=user, expires_at__gt=timezone.now())
+
+
+def _chunked_session(session_id, user, *, lock=False):
+    sessions = live_upload_sessions(user).filter(mode=UploadSession.MODE_CHUNKED, completed_at__isnull=True)
+    if lock:
+        sessions = sessions.select_for_update()
+    return sessions.get(pk=session_id)
+
+
+def append_chunk(session_id, user, offset, stream, length):
+    """
+    Writes `length` bytes from `stream` at `offset`. The offset must equal the bytes
+    already received, otherwise nothing is written. Returns (session, accepted).
+    """
+    session = _chunked_session(session_id, user)
+    if offset != session.offset:
+        return session, False
+    if length <= 0 or length > UPLOAD_CHUNK_MAX or offset + length > session.size:
+        raise ValidationError({"chunk": f"Chunk must be 1..{UPLOAD_CHUNK_MAX} bytes and stay within the declared size."})
+
+    # Read the (possibly slow) request body before taking the row lock, so a slow
+    # client never holds a lock or an open transaction
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as chunk:
+        remaining = length
+        while remaining:
+            block = stream.read(min(_READ_BLOCK, remaining))
+            if not block:
+                break
+            chunk.write(block)
+            remaining -= len(block)
+        received = length - remaining
+
+        with transaction.atomic():
+            session = _chunked_session(session_id, user, lock=True)
+            if offset != session.offset:
+                return session, False  # another request appended meanwhile
+
+            chunk.seek(0)
+            with open(session_file_path(session), "r+b") as fh:
+                fh.seek(offset)
+                while block := chunk.read(_READ_BLOCK):
+                    fh.write(block)
+                # Drop anything past the accepted offset left by an earlier interrupted write
+                fh.truncate(offset + received)
+
+            session.offset = offset + received
+            session.expires_at = timezone.now() + UPLOAD_SESSION_TTL
+            session.save(update_fields=["offset", "expires_at"])
+    return session, True
+
+
+def finalize_upload(session_id, user):
+    """
+    Pushes a complete upload to blob storage and creates its row. Returns
+    (kind, QuePdf serializer or AnsPdf instance); the session is removed on success.
+    """
+    with transaction.atomic():
+        # Claim the session (completed_at) under its row lock: a concurrent finalize
+        # no longer finds it, and no chunk can be appended while we upload
+        session = _chunked_session(session_id, user, lock=True)
+        if session.offset != session.size:
+            raise ValidationError({"offset": f"Upload incomplete: {session.offset} of {session.size} bytes received."})
+        session.completed_at = timezone.now()
+        session.save(update_fields=["completed_at"])
+
+    try:
+        path = session_file_path(session)
+        with open(path, "rb") as fh:
+            data = fh.read()
+
+        if session.kind == UploadSession.KIND_QUE:
+            blob = put(que_pdf_blob_path(session.metadata, session.filename), data, {"addRandomSuffix": "false"})
+            result = create_que_pdf(user, session.metadata, blob["url"])
+        else:
+            blob = put(ans_pdf_blob_path(session.metadata, session.filename), data, {"addRandomSuffix": "false"})
+            result = create_ans_pdf(user, session.metadata, blob["url"])
+    except Exception:
+        # Release the claim so the client can retry the finalize
+        UploadSession.objects.filter(pk=session.pk).update(completed_at=None)
+        raise
+
+    discard_upload_session(session)
+    return session.kind, result
+
+
+def discard_upload_session(session):
+    try:
+        os.remove(session_file_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def purge_expired_upload_sessions():
+    """Deletes expired sessions and their part files; returns the number removed."""
+    expired = list(UploadSession.objects.filter(expires_at__lt=timezone.now()))
+    for session in expired:
+        discard_upload_session(session)
+    if expired:
+        logger.info(f"Purged {len(expired)} expired upload session(s).")
+    return len(expired)
+
+
+# ==============================================================================
+# DIRECT-TO-BLOB UPLOADS
+# We issue a client token scoped to one pathname, size and content type; the client
+# uploads straight to blob storage, then either it calls confirm or blob storage
+# calls our callback. Whichever arrives first creates the row; the other is a no-op.
+# ==============================================================================
+
+DIRECT_TOKEN_TTL = timedelta(minutes=15)
+DIRECT_CONFIRM_GRACE = timedelta(hours=1)  # how long after the token expires a confirm is still accepted
+AVATAR_MAX_SIZE = 5 * 1024 * 1024
+PDF_CONTENT_TYPES = ("application/pdf",)
+AVATAR_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp", "image/gif")
+
+
+def _direct_limits(kind):
+    if kind == UploadSession.KIND_AVATAR:
+        return AVATAR_CONTENT_TYPES, AVATAR_MAX_SIZE
+    return PDF_CONTENT_TYPES, UPLOAD_MAX_SIZE
+
+
+def _direct_pathname(session):
+    # Session id in the path: no random suffix needed, and uploads can never overwrite each other
+    if session.kind == UploadSession.KIND_QUE:
+        folder = f"QuePdf/{session.metadata['choose']}/sem {session.metadata['sem']}"
+    elif session.kind == UploadSession.KIND_ANS:
+        folder = "AnsPdf"
+    else:
+        folder = "Profile"
+    return f"{folder}/{session.pk.hex}/{short_blob_name(session.filename)}"
+
+
+def start_direct_upload(user, kind, filename, size, metadata, *, callback_url=None):
+    """Opens a direct session; returns (session, client_token, valid_until)."""
+    filename = _clean_filename(filename)
+    content_types, max_size = _direct_limits(kind)
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ValidationError({"size": "A valid integer is required."})
+    if not 0 < size <= max_size:
+        raise ValidationError({"size": f"Must be between 1 and {max_size} bytes."})
+
+    valid_until = timezone.now() + DIRECT_TOKEN_TTL
+    session = UploadSession(
+        user=user,
+        kind=kind,
+        mode=UploadSession.MODE_DIRECT,
+        filename=filename,
+        size=size,
+        metadata=metadata,
+        expires_at=valid_until + DIRECT_CONFIRM_GRACE,
+    )
+    session.pathname = _direct_pathname(session)
+    token = generate_client_token(
+        session.pathname,
+        valid_until=valid_until.timestamp(),
+        allowed_content_types=content_types,
+        maximum_size=size,
+        callback_url=callback_url,
+        token_payload=str(session.pk),
+    )
+    session.save()
+    return session, token, valid_until
+
+
+def _head_uploaded_blob(session):
+    """Confirms the client's upload landed where the token allowed; returns its public URL."""
+    url = public_blob_url(session.pathname)
+    resp = requests.head(url, timeout=10, allow_redirects=True)
+    if resp.status_code == 404:
+        raise ValidationError({"upload": "Blob not found; upload it with the client token first."})
+    resp.raise_for_status()
+
+    content_types, _ = _direct_limits(session.kind)
+    content_type = resp.headers.get("Content-Type", "").split(";")[0].strip()
+    size = int(resp.headers.get("Content-Length") or 0)
+    if content_type not in content_types or size > session.size:
+        raise ValidationError({"upload": "Uploaded blob does not match the issued token."})
+    return url
+
+
+def _create_direct_row(session, blob_url):
+    if session.kind == UploadSession.KIND_QUE:
+        return create_que_pdf(session.user, session.metadata, blob_url).instance.pk
+    if session.kind == UploadSession.KIND_ANS:
+        return create_ans_pdf(session.user, session.metadata, blob_url).pk
+
+    profile_obj = ProfileModel.objects.filter(user_obj=session.user).first()
+    if not profile_obj:
+        raise ValidationError({"profile": "Profile not found"})
+    serializer = replace_profile_pic(profile_obj, blob_url)
+    if serializer.errors:
+        raise ValidationError(serializer.errors)
+    return profile_obj.pk
+
+
+def complete_direct_upload(session_id, *, user=None, blob=None):
+    """
+    Creates the row for a finished direct upload. `user` scopes client confirms; the
+    signed callback passes `blob` (storage's own upload result) instead of a HEAD check.
+    Idempotent: a session that already completed is returned unchanged; one that
+    expired before completing raises UploadSession.DoesNotExist.
+    """
+    sessions = UploadSession.objects.select_related('user').filter(mode=UploadSession.MODE_DIRECT)
+    if user is not None:
+        sessions = sessions.filter(user=user)
+    session = sessions.get(pk=session_id)
+    if session.completed_at:
+        return session
+    if session.expires_at <= timezone.now():
+        # Same as the chunked paths: an expired session is gone, even before the purge runs
+        raise UploadSession.DoesNotExist("Upload session expired")
+
+    if blob is not None:
+        if blob.get("pathname") != session.pathname:
+            raise ValidationError({"upload": "Callback blob does not match the session."})
+        blob_url = blob["url"]
+    else:
+        blob_url = _head_uploaded_blob(session)
+
+    with transaction.atomic():
+        # Lock so a confirm and the callback racing each other create exactly one row
+        session = UploadSession.objects.select_for_update().select_related('user').get(pk=session.pk)
+        if session.completed_at:
+            return session
+        session.result_id = _create_direct_row(session, blob_url)
+        session.completed_at = timezone.now()
+        session.save(update_fields=["result_id", "completed_at"])
+    logger.info(f"Completed direct {session.kind} upload {session.pk} -> row {session.result_id}.")
+    return session
@@ -1,5 +1,10 @@
 from django.urls import path
-from .views import CoursesView , QuePdfView , AnsPdfUploadView, AnsPdfView , QuePdfSubView , QuePdfGetSubView , QuePdfAddView
+from .views import (
+    CoursesView , QuePdfView , AnsPdfUploadView, AnsPdfView , AnsPdfBatchView , QuePdfSubView , QuePdfGetSubView , QuePdfAddView, QuePdfSearchView,
+    UploadSessionView, UploadSessionDetailView, UploadSessionFinalizeView,
+    UploadTokenView, UploadConfirmView, UploadCallbackView, QuePdfBatchAddView, QuePdfHitView, QuePdfPopularView,
+    CatalogSyncView,
+)
 
 
 urlpatterns = [
@@ -7,7 +12,19 @@ urlpatterns = [
     path('QuePdf/', QuePdfView.as_view(), name='QuePdf'),
     path('upload_pdf/', AnsPdfUploadView.as_view(), name='upload_pdf'),
     path('AnsPdf/', AnsPdfView.as_view(), name='upload_pdf'),
+    path('AnsPdf/batch/', AnsPdfBatchView.as_view(), name='AnsPdf_batch'),
     path('QuePdf/Subject_Pdf', QuePdfSubView.as_view(), name='QuePdf_Subject_Pdf'),
     path('QuePdf/Get_Subjact', QuePdfGetSubView.as_view(), name='QuePdf_Get_Subjact'),
     path('QuePdf/Add/', QuePdfAddView.as_view(), name='Quepdf_Add'),
+    path('QuePdf/AddBatch/', QuePdfBatchAddView.as_view(), name='QuePdf_AddBatch'),
+    path('QuePdf/<int:pk>/hit/', QuePdfHitView.as_view(), name='QuePdf_hit'),
+    path('QuePdf/popular/', QuePdfPopularView.as_view(), name='QuePdf_popular'),
+    path('search/', QuePdfSearchView.as_view(), name='search'),
+    path('sync/', CatalogSyncView.as_view(), name='catalog_sync'),
+    path('uploads/', UploadSessionView.as_view(), name='upload_session'),
+    path('uploads/token/', UploadTokenView.as_view(), name='upload_token'),
+    path('uploads/callback/', UploadCallbackView.as_view(), name='upload_callback'),
+    path('uploads/<uuid:upload_id>/confirm/', UploadConfirmView.as_view(), name='upload_confirm'),
+    path('uploads/<uuid:upload_id>/', UploadSessionDetailView.as_view(), name='upload_session_detail'),
+    path('uploads/<uuid:upload_id>/finalize/', UploadSessionFinalizeView.as_view(), name='upload_session_finalize'),
 ]   
\ No newline at end of file
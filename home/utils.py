@@ -0,0 +1,241 @@
+import io
+import logging
+import threading
+import uuid
+from pathlib import PurePosixPath
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from celery import shared_task
+from django.apps import apps
+from django.utils import timezone
+from vercel_blob import delete as del_, put
+
+from .counters import recompute_popularity
+from .models import CatalogChange
+from .search import index_que_pdf
+from .sync import compact_catalog_changes, record_catalog_changes
+
+# Set up a logger for this module
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# PDF PREVIEW EXTRACTION
+# Page count, size, first-page text and a small thumbnail, so list screens can
+# show a preview without the client downloading the whole PDF.
+# ==============================================================================
+
+PREVIEW_MODELS = ("QuePdf", "AnsPdf")
+PREVIEW_TEXT_LIMIT = 1000              # characters of first-page text kept on the row
+PREVIEW_THUMBNAIL_WIDTH = 240          # px; enough for a list tile
+PREVIEW_MAX_DOWNLOAD = 50 * 1024 * 1024  # don't pull anything bigger than this into the worker
+PREVIEW_FETCH_TIMEOUT = 30
+
+# PDFium is not thread-safe; serialise every call in case this runs on a threaded pool
+_PDFIUM_LOCK = threading.Lock()
+
+
+def extract_pdf_metadata(data: bytes, *, thumbnail_width: int = PREVIEW_THUMBNAIL_WIDTH) -> dict:
+    """
+    Reads page count, first-page text and renders a WebP thumbnail of page one.
+    Pure function over the PDF bytes (no DB / network), so it can be run locally.
+    Raises ValueError for corrupt, encrypted or otherwise unreadable PDFs.
+    """
+    # Imported lazily: only the worker and the backfill command need pdfium/Pillow
+    import pypdfium2 as pdfium
+    from PIL import Image
+
+    try:
+        with _PDFIUM_LOCK:
+            return _extract_pdf_metadata(pdfium, data, thumbnail_width)
+    except (pdfium.PdfiumError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Unreadable PDF: {e}")
+
+
+def _extract_pdf_metadata(pdfium, data, thumbnail_width):
+    result = {
+        "page_count": 0,
+        "file_size": len(data),
+        "first_page_text": "",
+        "thumbnail": None,
+    }
+
+    pdf = pdfium.PdfDocument(data)
+    try:
+        result["page_count"] = len(pdf)
+        if not result["page_count"]:
+            return result
+
+        page = pdf[0]
+        try:
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range() or ""
+            finally:
+                textpage.close()
+            # Collapse whitespace so the preview is a compact single block
+            result["first_page_text"] = " ".join(text.split())[:PREVIEW_TEXT_LIMIT]
+
+            width = page.get_width() or thumbnail_width
+            image = page.render(scale=thumbnail_width / width).to_pil()
+            buf = io.BytesIO()
+            image.convert("RGB").save(buf, format="WEBP", quality=70)
+            result["thumbnail"] = buf.getvalue()
+        finally:
+            page.close()
+    finally:
+        pdf.close()
+
+    return result
+
+
+def _delete_blob(url):
+    try:
+        del_(url)
+    except Exception as e:
+        logger.warning(f"Could not delete old thumbnail {url}: {e}")
+
+
+def _fetch_pdf_bytes(url: str) -> bytes:
+    """Downloads the PDF from blob storage, refusing anything above PREVIEW_MAX_DOWNLOAD."""
+    with requests.get(url, stream=True, timeout=PREVIEW_FETCH_TIMEOUT) as resp:
+        resp.raise_for_status()
+        size = int(resp.headers.get("Content-Length") or 0)
+        if size > PREVIEW_MAX_DOWNLOAD:
+            raise ValueError(f"PDF too large for preview extraction ({size} bytes)")
+
+        buf = io.BytesIO()
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            buf.write(chunk)
+            if buf.tell() > PREVIEW_MAX_DOWNLOAD:
+                raise ValueError("PDF too large for preview extraction")
+        return buf.getvalue()
+
+
+def build_pdf_preview(model_name: str, pk, *, force: bool = False) -> bool:
+    """
+    Extracts and stores the preview for one row. Idempotent: rows whose
+    preview_source already matches their pdf URL are skipped unless force=True.
+    Returns True when the row was (re)processed.
+    """
+    if model_name not in PREVIEW_MODELS:
+        raise ValueError(f"Unsupported model for PDF previews: {model_name}")
+    model = apps.get_model("home", model_name)
+
+    fields = ["id", "pdf", "preview_source", "thumbnail"] + (["que_pdf_id"] if model_name == "AnsPdf" else [])
+    row = model.objects.only(*fields).filter(pk=pk).first()
+    if not row:
+        logger.warning(f"{model_name} {pk} not found; skipping preview extraction.")
+        return False
+    if not row.pdf or not row.pdf.startswith(("http://", "https://")):
+        logger.info(f"{model_name} {pk} has no downloadable PDF; skipping preview extraction.")
+        return False
+    if not force and row.preview_source == row.pdf:
+        logger.debug(f"{model_name} {pk} preview already up to date.")
+        return False
+
+    meta = extract_pdf_metadata(_fetch_pdf_bytes(row.pdf))
+
+    thumbnail_url = ""
+    if meta["thumbnail"]:
+        # A new blob per extraction; the one it replaces is deleted below
+        blob = put(unique_blob_path(f"Thumbnails/{model_name}/{row.pk}.webp"), meta["thumbnail"], {"addRandomSuffix": "false"})
+        thumbnail_url = blob["url"]
+
+    # update() instead of save() so the post_save receivers don't fire again; guarded
+    # on pdf so a newer upload (and its own extraction task) owns the row
+    updated = model.objects.filter(pk=row.pk, pdf=row.pdf).update(
+        page_count=meta["page_count"],
+        file_size=meta["file_size"],
+        first_page_text=meta["first_page_text"],
+        thumbnail=thumbnail_url,
+        preview_source=row.pdf,
+        preview_extracted_at=timezone.now(),
+    )
+    if not updated:
+        if thumbnail_url:
+            _delete_blob(thumbnail_url)
+        logger.info(f"{model_name} {row.pk} changed during preview extraction; discarded this result.")
+        return False
+    if row.thumbnail and row.thumbnail != thumbnail_url:
+        _delete_blob(row.thumbnail)
+
+    logger.info(f"Stored preview for {model_name} {row.pk}: {meta['page_count']} pages, {meta['file_size']} bytes.")
+    record_catalog_changes(CatalogChange.MODEL_QUE_PDF if model_name == "QuePdf" else CatalogChange.MODEL_ANS_PDF, [row.pk])
+
+    # Extracted text is searchable; update() bypassed the signals that normally reindex
+    index_que_pdf(row.que_pdf_id if model_name == "AnsPdf" else row.pk)
+    return True
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 3})
+def extract_pdf_metadata_task(self, model_name, pk, force=False):
+    """Celery entry point for build_pdf_preview."""
+    try:
+        build_pdf_preview(model_name, pk, force=force)
+    except ValueError as e:
+        # Oversized / corrupt / encrypted input will not get better on retry
+        logger.warning(f"Skipping preview for {model_name} {pk}: {e}")
+
+
+# ==============================================================================
+# CONCURRENT BLOB UPLOADS
+# ==============================================================================
+
+BLOB_NAME_MAX_STEM = 80  # the blob URL (host + quoted path) must fit the 255-char URL columns
+
+
+def short_blob_name(filename):
+    """Caps a client-supplied file name so the blob path and URL built from it stay short."""
+    p = PurePosixPath(filename)
+    return f"{p.stem[:BLOB_NAME_MAX_STEM]}{p.suffix[:10]}"
+
+
+def unique_blob_path(path):
+    """
+    Adds a random suffix before the extension ("sem 3/maths.pdf" -> "sem 3/maths-1f3a9c0e.pdf"),
+    so two uploads with the same file name never share, or overwrite, one blob.
+    The file name is shortened with short_blob_name first.
+    """
+    p = PurePosixPath(path)
+    name = PurePosixPath(short_blob_name(p.name))
+    return str(p.with_name(f"{name.stem}-{uuid.uuid4().hex[:8]}{name.suffix}"))
+
+
+def upload_blobs_concurrently(jobs, *, max_workers=4):
+    """
+    Uploads [(blob_path, read_bytes), ...] with at most max_workers uploads in flight.
+    read_bytes() is called inside the worker thread, so at most max_workers files are
+    held in memory at once. Returns [(url, None) or (None, error), ...] in job order.
+    Paths should be unique (see unique_blob_path): nothing is overwritten.
+    """
+    def _upload(job):
+        path, read_bytes = job
+        try:
+            return put(path, read_bytes(), {"addRandomSuffix": "false"})["url"], None
+        except Exception as e:
+            logger.error(f"Blob upload failed for {path}: {e}")
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        return list(pool.map(_upload, jobs))
+
+
+# ==============================================================================
+# POPULARITY
+# ==============================================================================
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 3})
+def recompute_popularity_task(self):
+    """Scheduled by Celery beat (Pixel/celery.py)."""
+    recompute_popularity()
+
+
+# ==============================================================================
+# CATALOG SYNC
+# ==============================================================================
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True, retry_kwargs={'max_retries': 3})
+def compact_catalog_changes_task(self):
+    """Scheduled by Celery beat (Pixel/celery.py)."""
+    compact_catalog_changes()
@@ -1,20 +1,37 @@
 from rest_framework.response import Response
-from .models import CourseList, QuePdf, AnsPdf, Subject
+from .models import CourseList, QuePdf, AnsPdf, Subject, UploadSession, PopularQuePdf
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from django.views.decorators.csrf import csrf_exempt
-from .serializers import CourseListSerializer, QuePdfSerializer, AnsPdfSerializer, SubjectSerializer
+from .serializers import (
+    CourseListSerializer, QuePdfSerializer, AnsPdfSerializer, SubjectSerializer,
+    QuePdfValuesSerializer, AnsPdfValuesSerializer, PopularQuePdfValuesSerializer,
+)
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 import os
 from django.utils.decorators import method_decorator
 from vercel_blob import put
 from rest_framework.parsers import MultiPartParser, FormParser
 from dotenv import load_dotenv
-from .models import get_current_date, get_current_time
 from django.views.decorators.cache import never_cache
 from django.core.cache import cache
 from user.utils import user_key
 from user.authentication import CookieJWTAuthentication
+from .counters import record_hit
+from .sync import SYNC_PAGE_MAX, changes_since
+from .search import search_que_pdfs
+from .uploads import (
+    UPLOAD_CHUNK_MAX, create_que_pdf, create_ans_pdf, clean_upload_metadata, start_upload_session,
+    append_chunk, finalize_upload, discard_upload_session, live_upload_sessions,
+    start_direct_upload, complete_direct_upload,
+    create_que_pdf_batch,
+)
+from .blob_tokens import CALLBACK_SIGNATURE_HEADER, blob_upload_url, verify_callback_signature
+from rest_framework.permissions import AllowAny
+from django.urls import reverse
+import json
+from core.responses import cacheable_response, deprecated_response, streaming_json_response
 
 load_dotenv()
 
@@ -41,9 +58,9 @@ class QuePdfView(APIView):
 
     def get(self, request):
         try:
-            queryset = QuePdf.objects.all()
-            serializer = QuePdfSerializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Whole table: stream it so memory and time-to-first-byte stay flat as it grows
+            rows = QuePdfValuesSerializer.iter_rows(QuePdf.objects.order_by('id'), chunk_size=2000)
+            return streaming_json_response(request, rows)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -52,20 +69,33 @@ class QuePdfSubView(APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def _fetch(self, sub, course_name):
+        # Single fetch using only fields needed [web:27]
+        course = CourseList.objects.only('id', 'name').filter(name=course_name).first()
+        if not course:
+            return None
+        # Filter with explicit fields; .all() redundant after filter [web:27]
+        queryset = QuePdf.objects.filter(sub=sub, course_id=course.id).order_by('id')
+        return QuePdfValuesSerializer.data(queryset)
+
+    def get(self, request):
+        try:
+            data = self._fetch(request.query_params.get("sub"), request.query_params.get("course_name"))
+            if data is None:
+                return Response({"error": "Invalid course name"}, status=status.HTTP_400_BAD_REQUEST)
+            return cacheable_response(request, data)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     def post(self, request):
+        """Deprecated: use GET with ?sub=&course_name= so the response can be cached."""
         try:
             sub = request.data.get("sub")
             course_name = request.data.get("course_name")
-
-            # Single fetch using only fields needed [web:27]
-            course = CourseList.objects.only('id', 'name').filter(name=course_name).first()
-            if not course:
+            data = self._fetch(sub, course_name)
+            if data is None:
                 return Response({"error": "Invalid course name"}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Filter with explicit fields; .all() redundant after filter [web:27]
-            queryset = QuePdf.objects.filter(sub=sub, course_id=course.id)
-            serializer = QuePdfSerializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return deprecated_response(Response(data, status=status.HTTP_200_OK), request, {"sub": sub, "course_name": course_name})
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -74,14 +104,25 @@ class QuePdfGetSubView(APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def _fetch(self, course_name, sem):
+        # Filter with join by name; distinct preserved as in original [web:27]
+        queryset = Subject.objects.filter(course_obj__name=course_name, sem=sem).distinct()
+        return SubjectSerializer(queryset, many=True).data
+
+    def get(self, request):
+        try:
+            data = self._fetch(request.query_params.get("course_name"), request.query_params.get("sem"))
+            return cacheable_response(request, data)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     def post(self, request):
+        """Deprecated: use GET with ?course_name=&sem= so the response can be cached."""
         try:
             course_name = request.data.get("course_name")
             sem = request.data.get("sem")
-            # Filter with join by name; distinct preserved as in original [web:27]
-            queryset = Subject.objects.filter(course_obj__name=course_name, sem=sem).distinct()
-            serializer = SubjectSerializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = self._fetch(course_name, sem)
+            return deprecated_response(Response(data, status=status.HTTP_200_OK), request, {"course_name": course_name, "sem": sem})
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -95,7 +136,6 @@ class AnsPdfUploadView(APIView):
     def post(self, request):
         try:
             user = request.user
-            name = user.username
             content = request.data.get("content")
             file = request.FILES.get("pdf")
             qid = request.data.get("id")
@@ -103,8 +143,9 @@ class AnsPdfUploadView(APIView):
             if not file:
                 return Response({"error": "No file uploaded."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Minimal fetch of QuePdf to ensure FK valid [web:27]
-            que_pdf_obj = QuePdf.objects.only('id').get(id=qid)
+            # Fail fast on a bad FK before uploading anything [web:27]
+            if not QuePdf.objects.filter(id=qid).exists():
+                raise QuePdf.DoesNotExist
 
             token = os.getenv("BLOB_READ_WRITE_TOKEN")
             if not token:
@@ -118,7 +159,7 @@ class AnsPdfUploadView(APIView):
             except Exception as upload_error:
                 return Response({"error": f"Upload failed: {str(upload_error)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            ans_pdf = AnsPdf.objects.create(que_pdf=que_pdf_obj, name=name, contant=content, pdf=blob["url"])
+            ans_pdf = create_ans_pdf(user, {"id": qid, "content": content}, blob["url"])
 
             cache.delete(user_key(user))
             serializer = AnsPdfSerializer(ans_pdf)
@@ -134,13 +175,68 @@ class AnsPdfView(APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def _fetch(self, qid):
+        # Narrow query to FK filter; serializer controls fields [web:27]
+        queryset = AnsPdf.objects.filter(que_pdf=qid).select_related('que_pdf')
+        return AnsPdfSerializer(queryset, many=True).data
+
+    def get(self, request):
+        try:
+            return cacheable_response(request, self._fetch(request.query_params.get("id")))
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     def post(self, request):
+        """Deprecated: use GET with ?id= so the response can be cached."""
         try:
             qid = request.data.get("id")
-            # Narrow query to FK filter; serializer controls fields [web:27]
-            queryset = AnsPdf.objects.filter(que_pdf=qid).select_related('que_pdf')
-            serializer = AnsPdfSerializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return deprecated_response(Response(self._fetch(qid), status=status.HTTP_200_OK), request, {"id": qid})
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AnsPdfBatchView(APIView):
+    """Answers for many QuePdf ids in one round trip, grouped by id."""
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_IDS = 100
+
+    def _parse_ids(self, raw):
+        if isinstance(raw, str):
+            raw = [part for part in raw.split(",") if part.strip()]
+        ids = list(dict.fromkeys(int(x) for x in (raw or [])))  # dedupe, keep order
+        if not ids:
+            raise ValueError("ids is required")
+        if len(ids) > self.MAX_IDS:
+            raise ValueError(f"At most {self.MAX_IDS} ids per request")
+        return ids
+
+    def _fetch(self, ids):
+        grouped = {str(qid): [] for qid in ids}
+        # One IN query over values rows (no model instances); the response holds every row,
+        # so its size is bounded by MAX_IDS and the answers per question
+        queryset = AnsPdf.objects.filter(que_pdf_id__in=ids).order_by('que_pdf_id', 'id')
+        for item in AnsPdfValuesSerializer.iter_rows(queryset):
+            grouped[str(item['que_pdf'])].append(item)
+        return {"answers": grouped}
+
+    def get(self, request):
+        try:
+            try:
+                ids = self._parse_ids(request.query_params.get("ids"))
+            except (TypeError, ValueError) as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return cacheable_response(request, self._fetch(ids))
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def post(self, request):
+        try:
+            try:
+                ids = self._parse_ids(request.data.get("ids"))
+            except (TypeError, ValueError) as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(self._fetch(ids), status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -159,7 +255,6 @@ class QuePdfAddView(APIView):
             sem = request.data.get("sem")
             pdf = request.FILES.get("pdf")
             course_id = request.data.get("course_id", 1)
-            username = request.user.username
 
             # Upload PDF to blob storage (same logic) [web:27]
             try:
@@ -167,28 +262,370 @@ class QuePdfAddView(APIView):
             except Exception as upload_error:
                 return Response({"error": f"Upload failed: {str(upload_error)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            serializer = QuePdfSerializer(data={
-                "name": name,
-                "sub": sub,
-                "choose": choose,
-                "sem": sem,
-                "pdf": blob["url"],
-                "dateCreated": get_current_date(),
-                "timeCreated": get_current_time(),
-                "year": 2025,
-                "div": "all",
-                "course": course_id,
-                "username": username
-            })
-
             # Invalidate user cache key as before [web:27]
             cache.delete(user_key(request.user))
 
-            if serializer.is_valid():
-                serializer.save()
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            metadata = {"name": name, "sub": sub, "choose": choose, "sem": sem, "course_id": course_id}
+            serializer = create_que_pdf(request.user, metadata, blob["url"])
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(never_cache, name="dispatch")
+class QuePdfBatchAddView(APIView):
+    """
+    Many papers in one multipart request: repeated `pdf` files, shared defaults as plain
+    fields (sub, choose, sem, course_id) and an optional `items` JSON list, one object per
+    file in the same order, overriding any of those plus `name` (default: file name).
+    """
+    parser_classes = (MultiPartParser, FormParser)
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            files = request.FILES.getlist("pdf")
+            try:
+                overrides = json.loads(request.data.get("items") or "[]")
+            except ValueError:
+                return Response({"error": "items must be a JSON list"}, status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(overrides, list) or (overrides and len(overrides) != len(files)):
+                return Response({"error": "items must be a list with one entry per pdf"}, status=status.HTTP_400_BAD_REQUEST)
+            if not all(isinstance(item, dict) for item in overrides):
+                return Response({"error": "each entry in items must be a JSON object"}, status=status.HTTP_400_BAD_REQUEST)
+
+            defaults = {key: request.data.get(key) for key in ("sub", "choose", "sem")}
+            defaults["course_id"] = request.data.get("course_id", 1)
+            items = []
+            for index, pdf in enumerate(files):
+                metadata = {**defaults, "name": os.path.splitext(pdf.name)[0]}
+                metadata.update(overrides[index] if overrides else {})
+                items.append((metadata, pdf))
+
+            created, failures = create_que_pdf_batch(request.user, items)
+            cache.delete(user_key(request.user))
+            failed = [{"index": index, "filename": name, "error": error} for index, name, error in failures]
+            if not created:
+                return Response({"error": "Upload failed", "failed": failed}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({"created": QuePdfSerializer(created, many=True).data, "failed": failed}, status=status.HTTP_201_CREATED)
+
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _upload_session_payload(session):
+    return {
+        "upload_id": str(session.pk),
+        "kind": session.kind,
+        "filename": session.filename,
+        "size": session.size,
+        "offset": session.offset,
+        "chunk_max": UPLOAD_CHUNK_MAX,
+        "expires_at": session.expires_at,
+    }
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(never_cache, name="dispatch")
+class UploadSessionView(APIView):
+    """Step 1 of a resumable upload: validates the row fields and opens a session."""
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            kind = request.data.get("kind")
+            metadata = clean_upload_metadata(kind, request.user, request.data)
+            session = start_upload_session(request.user, kind, request.data.get("filename"), request.data.get("size"), metadata)
+            return Response(_upload_session_payload(session), status=status.HTTP_201_CREATED)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(never_cache, name="dispatch")
+class UploadSessionDetailView(APIView):
+    """
+    GET: where to resume (current offset). PATCH: raw chunk bytes as the body, written at
+    the Upload-Offset header, which must equal the current offset. DELETE: abort.
+    """
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        try:
+            session = live_upload_sessions(request.user).get(pk=upload_id)
+            return Response(_upload_session_payload(session), status=status.HTTP_200_OK)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def patch(self, request, upload_id):
+        try:
+            try:
+                offset = int(request.headers.get("Upload-Offset", ""))
+                length = int(request.headers.get("Content-Length") or 0)
+            except ValueError:
+                return Response({"error": "Upload-Offset header is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Read the body straight off the request stream; never parsed or buffered whole
+            session, accepted = append_chunk(upload_id, request.user, offset, request._request, length)
+            response = Response(_upload_session_payload(session), status=status.HTTP_200_OK if accepted else status.HTTP_409_CONFLICT)
+            response["Upload-Offset"] = str(session.offset)
+            return response
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def delete(self, request, upload_id):
+        try:
+            discard_upload_session(UploadSession.objects.get(pk=upload_id, user=request.user))
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(never_cache, name="dispatch")
+class UploadSessionFinalizeView(APIView):
+    """Last step: pushes the assembled file to blob storage and creates the QuePdf / AnsPdf row."""
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        try:
+            kind, result = finalize_upload(upload_id, request.user)
+            cache.delete(user_key(request.user))
+            data = result.data if kind == UploadSession.KIND_QUE else AnsPdfSerializer(result).data
+            return Response(data, status=status.HTTP_201_CREATED)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        except QuePdf.DoesNotExist:
+            return Response({"error": "Invalid question reference"}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _direct_upload_result(session):
+    if session.kind == UploadSession.KIND_QUE:
+        return QuePdfSerializer(QuePdf.objects.get(pk=session.result_id)).data
+    if session.kind == UploadSession.KIND_ANS:
+        return AnsPdfSerializer(AnsPdf.objects.get(pk=session.result_id)).data
+    return {"profile_pic_url": session.user.profiles.only('profile_pic').get(pk=session.result_id).profile_pic}
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(never_cache, name="dispatch")
+class UploadTokenView(APIView):
+    """
+    Issues a short-lived client token for one direct-to-blob upload (QuePdf, AnsPdf or
+    profile picture). The bytes never pass through this server; only the confirm does.
+    """
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            kind = request.data.get("kind")
+            metadata = clean_upload_metadata(kind, request.user, request.data)
+            session, client_token, valid_until = start_direct_upload(
+                request.user,
+                kind,
+                request.data.get("filename"),
+                request.data.get("size"),
+                metadata,
+                callback_url=request.build_absolute_uri(reverse("upload_callback")),
+            )
+            return Response({
+                "upload_id": str(session.pk),
+                "pathname": session.pathname,
+                "upload_url": blob_upload_url(session.pathname),
+                "client_token": client_token,
+                "valid_until": valid_until,
+            }, status=status.HTTP_201_CREATED)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(never_cache, name="dispatch")
+class UploadConfirmView(APIView):
+    """Client-side completion of a direct upload: checks the blob landed, then creates the row."""
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        try:
+            session = complete_direct_upload(upload_id, user=request.user)
+            cache.delete(user_key(request.user))
+            return Response(_direct_upload_result(session), status=status.HTTP_201_CREATED)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        except QuePdf.DoesNotExist:
+            return Response({"error": "Invalid question reference"}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+class UploadCallbackView(APIView):
+    """Blob storage's upload-completed webhook; authenticated by its HMAC signature, not a user."""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        try:
+            body = request.body
+            if not verify_callback_signature(body, request.headers.get(CALLBACK_SIGNATURE_HEADER)):
+                return Response({"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN)
+
+            event = json.loads(body)
+            if event.get("type") != "blob.upload-completed":
+                return Response({"status": "ignored"}, status=status.HTTP_200_OK)
+
+            payload = event.get("payload") or {}
+            session = complete_direct_upload(payload.get("tokenPayload"), blob=payload.get("blob") or {})
+            cache.delete(user_key(session.user))
+            return Response({"status": "ok", "upload_id": str(session.pk)}, status=status.HTTP_200_OK)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+@method_decorator(never_cache, name="dispatch")
+class QuePdfHitView(APIView):
+    """Counts a view or download; buffered in-process and flushed in bulk (see counters.py)."""
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        try:
+            record_hit(pk, request.data.get("event", "view"))
+            return Response({"status": "recorded"}, status=status.HTTP_202_ACCEPTED)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+class QuePdfPopularView(APIView):
+    """Most viewed/downloaded papers of a semester, or of one subject when `sub` is given."""
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_LIMIT = 50
+
+    def get(self, request):
+        try:
+            course_name = request.query_params.get("course_name")
+            sub = request.query_params.get("sub")
+            try:
+                sem = int(request.query_params.get("sem", ""))
+                limit = min(max(int(request.query_params.get("limit", 10)), 1), self.MAX_LIMIT)
+            except ValueError:
+                return Response({"error": "sem and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+            course = CourseList.objects.only('id').filter(name=course_name).first()
+            if not course:
+                return Response({"error": "Invalid course name"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Precomputed ranks: an index range scan on PopularQuePdf, no sorting of counters here
+            queryset = QuePdf.objects.filter(popularity__course_id=course.id, popularity__sem=sem)
+            if sub:
+                queryset = queryset.filter(popularity__sub=sub, popularity__subject_rank__lte=limit).order_by('popularity__subject_rank')
             else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(popularity__semester_rank__lte=limit).order_by('popularity__semester_rank')
+
+            computed_at = PopularQuePdf.objects.order_by().values_list('computed_at', flat=True).first()
+            return cacheable_response(request, {
+                "results": PopularQuePdfValuesSerializer.data(queryset),
+                "computed_at": computed_at,
+            })
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+class CatalogSyncView(APIView):
+    """
+    Catalog changes (courses, subjects, papers, answers) after ?since=<version>, oldest
+    first. Clients store the returned `version`, repeat while has_more, and on reset=True
+    drop their copy and start again from since=0.
+    """
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            try:
+                since = max(int(request.query_params.get("since", 0)), 0)
+                limit = min(max(int(request.query_params.get("limit", SYNC_PAGE_MAX)), 1), SYNC_PAGE_MAX)
+            except ValueError:
+                return Response({"error": "since and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+            # Same since -> same page until new changes arrive, so ETag revalidation works
+            return cacheable_response(request, changes_since(since, limit=limit), max_age=0)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@method_decorator(csrf_exempt, name="dispatch")
+class QuePdfSearchView(APIView):
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_PAGE_SIZE = 50
+
+    def get(self, request):
+        try:
+            query = (request.query_params.get("q") or "").strip()
+            if not query:
+                return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                page = max(int(request.query_params.get("page", 1)), 1)
+                page_size = min(max(int(request.query_params.get("page_size", 20)), 1), self.MAX_PAGE_SIZE)
+                sem = request.query_params.get("sem")
+                sem = int(sem) if sem else None
+            except ValueError:
+                return Response({"error": "page, page_size and sem must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+            course_id = None
+            course_name = request.query_params.get("course_name")
+            if course_name:
+                course = CourseList.objects.only('id').filter(name=course_name).first()
+                if not course:
+                    return Response({"error": "Invalid course name"}, status=status.HTTP_400_BAD_REQUEST)
+                course_id = course.id
+
+            # Ask for one extra hit to know whether another page exists without a COUNT
+            hits = search_que_pdfs(query, course_id=course_id, sem=sem, limit=page_size + 1, offset=(page - 1) * page_size)
+            has_next = len(hits) > page_size
+            hits = hits[:page_size]
+
+            rows = QuePdf.objects.in_bulk([pk for pk, _ in hits])
+            ranked = [(rows[pk], rank) for pk, rank in hits if pk in rows]
+            data = QuePdfSerializer([obj for obj, _ in ranked], many=True).data
+            results = []
+            for item, (_, rank) in zip(data, ranked):
+                item["rank"] = rank
+                results.append(item)
 
+            return Response({
+                "results": results,
+                "page": page,
+                "page_size": page_size,
+                "has_next": has_next,
+            }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)